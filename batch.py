@@ -0,0 +1,201 @@
+"""
+Description
+-----------
+This module scores many gobans of the go module at once with NumPy
+
+A batch of gobans is an (N, n, n) int8 array where element [k, r - 1, c] is
+0, 1 or 2 if the intersection at column c (from 0) and row r of the k-th
+goban is free or occupied by a black or white stone, respectively, i.e. the
+board of each goban in reading order
+
+Functions
+---------
+gobans_to_array(gobans)
+    Return the batch of gobans with the stones of each goban
+calculate_scores_batch(array)
+    Return each player's score on every goban of a batch
+"""
+
+import numpy as np
+
+from go import is_goban
+
+# Codes of the stones in a batch, the same used by the boards of the gobans
+NEUTRAL, BLACK, WHITE = 0, 1, 2
+
+
+def gobans_to_array(gobans):
+    """
+    Return the batch of gobans with the stones of each goban
+
+    Parameters
+    ----------
+    gobans : iterable
+        Gobans of the same dimension n
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, n, n) int8 array with the stones of the N gobans
+
+    Raises
+    ------
+    ValueError:
+        If 'gobans' contains something that is not a goban, or gobans of
+        different dimensions
+    """
+    gobans = list(gobans)
+
+    if (
+        len(gobans) == 0 or
+        any(not is_goban(x) for x in gobans) or
+        any(x["size"] != gobans[0]["size"] for x in gobans)
+    ):
+        raise ValueError("gobans_to_array: argumento invalido")
+
+    n = gobans[0]["size"]
+
+    return np.frombuffer(b"".join(bytes(x["board"]) for x in gobans),dtype = np.int8).reshape(-1,n,n)
+
+
+def _label_regions(free):
+    """
+    Return the label of the region of free intersections of each intersection
+
+    Every free intersection starts with its own flat index as label. Each
+    step takes the smallest label among every free intersection and its free
+    adjacent intersections, lowers the label of the intersection its label
+    points to (hooking), and then replaces every label by the label of the
+    intersection it points to until no label changes (pointer jumping). The
+    labels always point to an intersection of the same region with a label no
+    larger, so long regions are labelled in a few steps instead of one step
+    per intersection of their longest path
+
+    Parameters
+    ----------
+    free : numpy.ndarray
+        (N, n, n) boolean array with the free intersections of each goban
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, n, n) int64 array where the free intersections of the same region
+        share the smallest flat index of its intersections in the batch, and
+        the occupied intersections have the label N*n*n
+    """
+    size = free.size
+    points = np.flatnonzero(free)
+
+    # Flat labels with an extra element, the label of the occupied
+    # intersections, that points to itself
+    flat = np.full(size + 1,size,dtype = np.int64)
+    flat[points] = points
+    labels = flat[:size].reshape(free.shape)
+
+    while True:
+        # Smallest label among each free intersection and its free adjacent
+        # intersections
+        smallest = labels.copy()
+        np.minimum(smallest[:,1:,:],np.where(free[:,:-1,:],labels[:,:-1,:],size),out = smallest[:,1:,:])
+        np.minimum(smallest[:,:-1,:],np.where(free[:,1:,:],labels[:,1:,:],size),out = smallest[:,:-1,:])
+        np.minimum(smallest[:,:,1:],np.where(free[:,:,:-1],labels[:,:,:-1],size),out = smallest[:,:,1:])
+        np.minimum(smallest[:,:,:-1],np.where(free[:,:,1:],labels[:,:,1:],size),out = smallest[:,:,:-1])
+        smallest = smallest.reshape(-1)[points]
+
+        targets = flat[points]
+        changed = (smallest < targets).any()
+        np.minimum.at(flat,targets,smallest)
+        np.minimum.at(flat,points,smallest)
+
+        # Follow the labels until each one points to a label of its own
+        while True:
+            jumped = flat[flat]
+            if np.array_equal(jumped,flat):
+                break
+            flat = jumped
+            labels = flat[:size].reshape(free.shape)
+
+        if not changed:
+            return labels
+
+
+def _adjacent_to(array,code):
+    """
+    Return which intersections are adjacent to a stone
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        Batch of gobans
+    code : int
+        Code of the stone
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, n, n) boolean array, True where an adjacent intersection is
+        occupied by the stone 'code'
+    """
+    stones = array == code
+    adjacent = np.zeros_like(stones)
+
+    adjacent[:,1:,:] |= stones[:,:-1,:]
+    adjacent[:,:-1,:] |= stones[:,1:,:]
+    adjacent[:,:,1:] |= stones[:,:,:-1]
+    adjacent[:,:,:-1] |= stones[:,:,1:]
+
+    return adjacent
+
+
+def calculate_scores_batch(array):
+    """
+    Return each player's score on every goban of a batch
+
+    The scores are the same returned by calculate_scores for each goban. As in
+    calculate_scores, a territory whose border has no stones, which only
+    happens on an empty goban, is not counted for either player
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        (N, n, n) int8 batch of gobans
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 2) int64 array with the scores of the white and black player,
+        respectively, on each goban
+
+    Raises
+    ------
+    ValueError:
+        If 'array' is not an (N, n, n) array with n equal to 9, 13, or 19
+        and the codes 0, 1 and 2
+    """
+    array = np.asarray(array)
+
+    if (
+        array.ndim != 3 or
+        array.shape[1] != array.shape[2] or
+        array.shape[1] not in (9,13,19) or
+        not np.isin(array,(NEUTRAL,BLACK,WHITE)).all()
+    ):
+        raise ValueError("calculate_scores_batch: argumento invalido")
+
+    free = array == NEUTRAL
+    labels = _label_regions(free)
+    size = array.size
+
+    # A region is bordered by a player if any of its intersections is
+    # adjacent to one of that player's stones
+    by_white = np.bincount(labels[free],weights = _adjacent_to(array,WHITE)[free],minlength = size + 1) > 0
+    by_black = np.bincount(labels[free],weights = _adjacent_to(array,BLACK)[free],minlength = size + 1) > 0
+
+    # Territories bordered only by one player count for that player
+    white_territory = free & (by_white & ~by_black)[labels]
+    black_territory = free & (by_black & ~by_white)[labels]
+
+    return np.stack((
+        (array == WHITE).sum(axis = (1,2)) + white_territory.sum(axis = (1,2)),
+        (array == BLACK).sum(axis = (1,2)) + black_territory.sum(axis = (1,2))
+    ),axis = 1).astype(np.int64)
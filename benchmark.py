@@ -0,0 +1,342 @@
+"""
+Description
+-----------
+This module measures the speed of the go module
+
+Every benchmark runs on positions obtained by seeded random games, so two
+runs with the same seed measure the same work. The results, in microseconds
+per call, can be saved as JSON and compared with an earlier run, failing if
+any benchmark became slower than a threshold allows. The number of random
+playouts per second on each goban is reported from the playout benchmark
+
+Usage
+-----
+python3 benchmark.py [--seconds SECONDS] [--seed SEED] [--sizes N...] [--only NAME...]
+                    [--output FILE] [--load FILE] [--compare FILE] [--threshold FRACTION]
+
+Functions
+---------
+create_position(n,seed,moves)
+    Return the goban and the history of a seeded random game
+measure(function,seconds,repeats)
+    Return the time of a call to a function
+run_benchmarks(sizes,seconds,seed,names)
+    Return the time of a call to each benchmarked function on each goban
+compare_results(baseline,results,threshold)
+    Print the change of each benchmark and return the regressions
+main(arguments)
+    Run the benchmarks, save their results and compare them with a baseline
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+
+from go import (
+    calculate_scores, classify_move, copy_goban, create_black_stone,
+    create_empty_goban, create_neutral_stone, create_white_stone, get_chain,
+    get_hash, get_intersections, get_legal_moves, get_territories,
+    goban_to_str, gobans_equal, is_black_stone, is_legal_move, make_move,
+    playout, unmake_move
+)
+from go import _LABELS
+
+# Version of the format of the saved results
+FORMAT = 1
+
+
+def create_position(n,seed,moves = None):
+    """
+    Return the goban and the history of a seeded random game
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+    seed : int
+        Seed of the generator of the random moves
+    moves : int, optional
+        Number of turns of the game, n*n//2 by default
+
+    Returns
+    -------
+    tuple
+        Pair with the goban at the end of the game and the set of the hashes
+        of every goban that occurred during it
+    """
+    goban = create_empty_goban(n)
+    history = {get_hash(goban)}
+    rng = random.Random(seed)
+    stone = create_black_stone()
+
+    for _ in range(n*n//2 if moves is None else moves):
+        legal_moves = get_legal_moves(goban,stone,history)
+        if legal_moves:
+            make_move(goban,rng.choice(legal_moves),stone)
+            history.add(get_hash(goban))
+        stone = create_white_stone() if is_black_stone(stone) else create_black_stone()
+
+    return goban, history
+
+
+def _find_capture(goban,history,seed):
+    """
+    Return a goban where a move captures stones, together with that move
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which a random game is continued until a capture is possible
+    history : set
+        Hashes of every goban that occurred earlier in the game
+    seed : int
+        Seed of the generator of the random moves
+
+    Returns
+    -------
+    tuple
+        Triple with the goban, the intersection and the stone of the capture
+    """
+    goban = copy_goban(goban)
+    history = set(history)
+    rng = random.Random(seed)
+    stone = create_black_stone()
+
+    while True:
+        legal_moves = get_legal_moves(goban,stone,history)
+        for intersection in legal_moves:
+            if classify_move(goban,intersection,stone,history) == "capture":
+                return goban, intersection, stone
+
+        if legal_moves:
+            make_move(goban,rng.choice(legal_moves),stone)
+            history.add(get_hash(goban))
+        stone = create_white_stone() if is_black_stone(stone) else create_black_stone()
+
+
+def measure(function,seconds,repeats = 5):
+    """
+    Return the time of a call to a function
+
+    The number of calls per repetition is first doubled until a repetition
+    lasts a fraction of 'seconds', and the fastest repetition is kept, as
+    the slower ones were only disturbed by other work of the machine
+
+    Parameters
+    ----------
+    function : function
+        Function without parameters to call
+    seconds : float
+        Approximate duration of the measurement
+    repeats : int, optional
+        Number of repetitions
+
+    Returns
+    -------
+    float
+        Seconds per call in the fastest repetition
+    """
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds/(2*repeats):
+            break
+        calls *= 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best,time.perf_counter() - start)
+
+    return best/calls
+
+
+def _benchmarks(n,seed):
+    """
+    Return the benchmarked functions on an n x n goban
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+    seed : int
+        Seed of the random game of the position
+
+    Returns
+    -------
+    dict
+        Function without parameters of each benchmark, indexed by its name
+    """
+    goban, history = create_position(n,seed)
+    copy = copy_goban(goban)
+    capture_goban, capture, capture_stone = _find_capture(goban,history,seed)
+
+    stones = itertools.cycle(get_intersections(goban,create_black_stone()) + \
+                             get_intersections(goban,create_white_stone()))
+    free = itertools.cycle(get_intersections(goban,create_neutral_stone()))
+    empty = create_empty_goban(n)
+    rng = random.Random(seed)
+
+    def uncached(function):
+        """Return a function that calls another on the goban without the cached regions"""
+        def call():
+            _LABELS.clear()
+            return function(goban)
+        return call
+
+    def capture_and_undo():
+        """Perform the capture and undo it"""
+        unmake_move(capture_goban,make_move(capture_goban,capture,capture_stone,True))
+
+    return {
+        "get_chain": lambda: get_chain(goban,next(stones)),
+        "get_territories": uncached(get_territories),
+        "calculate_scores": uncached(calculate_scores),
+        "make_move_capture": capture_and_undo,
+        "is_legal_move": lambda: is_legal_move(goban,next(free),create_black_stone(),None,history),
+        "copy_goban": lambda: copy_goban(goban),
+        "gobans_equal": lambda: gobans_equal(goban,copy),
+        "goban_to_str": lambda: goban_to_str(goban),
+        "playout": lambda: playout(empty,create_black_stone(),rng),
+        "playout_patterns": lambda: playout(empty,create_black_stone(),rng,None,True)
+    }
+
+
+def run_benchmarks(sizes = (9,13,19),seconds = 0.5,seed = 0,names = None):
+    """
+    Return the time of a call to each benchmarked function on each goban
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        Dimensions of the gobans
+    seconds : float, optional
+        Approximate duration of each benchmark
+    seed : int, optional
+        Seed of the random games
+    names : iterable, optional
+        Names of the benchmarks to run, all of them by default
+
+    Returns
+    -------
+    dict
+        Microseconds per call of each benchmark, indexed by "name nxn"
+    """
+    results = {}
+
+    for n in sizes:
+        for name, function in _benchmarks(n,seed).items():
+            if names is None or name in names:
+                results["{0} {1}x{1}".format(name,n)] = measure(function,seconds)*1e6
+
+    return results
+
+
+def compare_results(baseline,results,threshold):
+    """
+    Print the change of each benchmark and return the regressions
+
+    Parameters
+    ----------
+    baseline : dict
+        Microseconds per call of each benchmark in the earlier run
+    results : dict
+        Microseconds per call of each benchmark in the later run
+    threshold : float
+        Largest accepted slowdown, as a fraction of the earlier time
+
+    Returns
+    -------
+    list
+        Names of the benchmarks of both runs that became slower than
+        'threshold' allows
+    """
+    regressions = []
+
+    for name in sorted(set(baseline) & set(results)):
+        change = results[name]/baseline[name] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+
+        print("{:<28}{:>12.2f}{:>12.2f}{:>+9.1%}{}".format(
+            name,baseline[name],results[name],change,"  REGRESSION" if regressed else ""))
+
+    return regressions
+
+
+def main(arguments = None):
+    """
+    Run the benchmarks, save their results and compare them with a baseline
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+
+    Raises
+    ------
+    SystemExit:
+        If a benchmark became slower than the threshold allows
+    """
+    parser = argparse.ArgumentParser(description = "Measure the speed of the go module")
+    parser.add_argument("--seconds",type = float,default = 0.5,help = "duration of each benchmark")
+    parser.add_argument("--seed",type = int,default = 0,help = "seed of the random games")
+    parser.add_argument("--sizes",type = int,nargs = "+",default = [9,13,19],help = "dimensions of the gobans")
+    parser.add_argument("--only",nargs = "+",default = None,help = "names of the benchmarks to run")
+    parser.add_argument("--output",help = "JSON file where the results are saved")
+    parser.add_argument("--load",help = "JSON file with saved results to use instead of running the benchmarks")
+    parser.add_argument("--compare",help = "JSON file with the results of an earlier run")
+    parser.add_argument("--threshold",type = float,default = 0.1,help = "largest accepted slowdown, as a fraction")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.load is not None:
+        with open(arguments.load) as file:
+            run = json.load(file)
+    else:
+        run = {
+            "format": FORMAT,
+            "python": platform.python_version(),
+            "seed": arguments.seed,
+            "results": run_benchmarks(arguments.sizes,arguments.seconds,arguments.seed,arguments.only)
+        }
+
+    if arguments.output is not None:
+        with open(arguments.output,"w") as file:
+            json.dump(run,file,indent = 2,sort_keys = True)
+
+    if arguments.compare is None:
+        for name, microseconds in run["results"].items():
+            print("{:<28}{:>12.2f} us".format(name,microseconds))
+    else:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        regressions = compare_results(baseline["results"],run["results"],arguments.threshold)
+
+    # Playouts per second, from the time of a random playout on each goban
+    playouts = {int(x.split()[1].split("x")[0]): y for x, y in run["results"].items() if x.startswith("playout ")}
+    for n in sorted(playouts):
+        print("{0}x{0}: {1:.1f} playouts/s".format(n,1e6/playouts[n]))
+
+    if arguments.compare is None:
+        return
+
+    if baseline.get("seed") != run.get("seed"):
+        print("warning: the runs used different seeds",file = sys.stderr)
+
+    if regressions:
+        sys.exit("{} benchmark(s) slower than {:.0%}: {}".format(
+            len(regressions),arguments.threshold,", ".join(regressions)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Description
+-----------
+This module builds and reads an opening book of the go module, an on-disk
+index from positions to the results of the games where they occurred
+
+The book is built offline from SGF game records. For every position of the
+first moves of each game, it keeps the number of times the position was seen
+with the same player to move, the number of those games won by the white
+player, and the moves played next with their own counts. The winner of a
+game is decided as in go(): by the scores of its final goban, with the white
+player winning ties
+
+A book file is an open addressing hash table of fixed-size slots, indexed by
+the Zobrist hash of the position, and is read through mmap, so a lookup
+reads a few slots without loading the file
+
+A book is represented by a dictionary with:
+-> "file": the open book file
+-> "mmap": memory map of the file
+-> "capacity": number of slots of the table
+-> "entries": number of positions in the table
+
+Usage
+-----
+python3 book.py OUTPUT RECORD_OR_DIRECTORY... [--depth N] [--min-seen N]
+
+Functions
+---------
+build_book(path,games,depth,min_seen)
+    Build a book file from game records and return the number of positions
+open_book(path)
+    Return a book reading a book file
+close_book(book)
+    Close a book
+lookup(book,goban,stone)
+    Return the statistics of a position of a book, or None if it is not in it
+create_book_player(book,fallback,min_seen)
+    Return a player that replies with the book in known positions
+main(arguments)
+    Build a book file from the SGF files given in the command line
+"""
+
+import argparse
+import mmap
+import os
+import struct
+
+from go import (
+    calculate_scores, classify_move, create_goban,
+    create_intersection, get_col, get_hash, get_row, is_black_stone,
+    is_legal_move, make_move
+)
+from replay import find_records
+from sgf import read_games
+
+# Magic bytes at the start of a book file, and layout of its header
+MAGIC = b"GOBOOK\x01\x00"
+HEADER = struct.Struct("<8sQQ")
+
+# Maximum number of next moves kept for each position
+MOVES = 8
+
+# Layout of a slot: hash, dimension (0 in empty slots), player to move (1 for
+# black, 2 for white), number of next moves, times seen and white wins,
+# followed by MOVES triples (point, times played, white wins)
+SLOT = struct.Struct("<QBBHII" + MOVES*"HII")
+
+# Point of a pass in a slot
+PASS = 0xFFFF
+
+# Constant mixing the player to move into the hash of a position
+_PLAYER_KEY = 0x9E3779B97F4A7C15
+
+
+def _to_point(intersection,n):
+    """Return the point of an intersection of an n x n goban, or PASS for None"""
+    if intersection is None:
+        return PASS
+
+    return (get_row(intersection) - 1)*n + ord(get_col(intersection)) - ord("A")
+
+
+def _to_intersection(point,n):
+    """Return the intersection of a point of an n x n goban, or None for PASS"""
+    if point == PASS:
+        return None
+
+    return create_intersection(chr(ord("A") + point % n),point // n + 1)
+
+
+def _first_slot(position_hash,n,player,capacity):
+    """Return the first slot where a position is searched for"""
+    return (position_hash ^ (player*_PLAYER_KEY) ^ n) % capacity
+
+
+def _replay(game,depth):
+    """
+    Return the positions of the first moves of a game and whether white won
+
+    Parameters
+    ----------
+    game : dict
+        Game read by sgf.read_games
+    depth : int
+        Number of moves whose positions are returned
+
+    Returns
+    -------
+    tuple or None
+        Pair with a list of triples (hash, player to move, point of the next
+        move) and whether the white player won, or None if the game could
+        not be replayed to its end
+    """
+    if game["error"] is not None:
+        return None
+
+    try:
+        goban = create_goban(game["size"],game["white_stones"],game["black_stones"])
+    except ValueError:
+        return None
+
+    n = game["size"]
+    history = {get_hash(goban)}
+    positions = []
+
+    for stone, intersection in game["moves"]:
+        player = 1 if is_black_stone(stone) else 2
+        if len(positions) < depth:
+            positions.append((get_hash(goban),player,_to_point(intersection,n)))
+
+        if intersection is not None:
+            if classify_move(goban,intersection,stone,history) not in ("placement","capture"):
+                return None
+            make_move(goban,intersection,stone)
+            history.add(get_hash(goban))
+
+    white_score, black_score = calculate_scores(goban)
+
+    return positions, white_score >= black_score
+
+
+def build_book(path,games,depth = 30,min_seen = 1):
+    """
+    Build a book file from game records and return the number of positions
+
+    Games with moves that cannot be read or are illegal are left out
+
+    Parameters
+    ----------
+    path : str
+        Path of the book file, replaced if it exists
+    games : iterable
+        Games read by sgf.read_games
+    depth : int, optional
+        Number of moves of each game whose positions enter the book
+    min_seen : int, optional
+        Minimum number of times a position must be seen to enter the book
+
+    Returns
+    -------
+    int
+        Number of positions in the book
+    """
+    statistics = {}
+
+    for game in games:
+        replayed = _replay(game,depth)
+        if replayed is None:
+            continue
+
+        positions, white_won = replayed
+        for position_hash, player, point in positions:
+            entry = statistics.setdefault((position_hash,game["size"],player),[0,0,{}])
+            move = entry[2].setdefault(point,[0,0])
+            entry[0] += 1
+            entry[1] += white_won
+            move[0] += 1
+            move[1] += white_won
+
+    entries = {key: entry for key, entry in statistics.items() if entry[0] >= min_seen}
+
+    # Keep at most half of the slots occupied, so probe sequences stay short
+    capacity = 1
+    while capacity < 2*len(entries):
+        capacity *= 2
+
+    table = bytearray(capacity*SLOT.size)
+    for (position_hash, n, player), (seen, white_wins, moves) in entries.items():
+        slot = _first_slot(position_hash,n,player,capacity)
+        while table[slot*SLOT.size + 8] != 0:
+            slot = (slot + 1) % capacity
+
+        moves = sorted(moves.items(),key = lambda x: (-x[1][0],x[0]))[:MOVES]
+        fields = [field for point, (played, wins) in moves for field in (point,played,wins)]
+        fields += (MOVES - len(moves))*[0,0,0]
+        SLOT.pack_into(table,slot*SLOT.size,position_hash,n,player,len(moves),seen,white_wins,*fields)
+
+    with open(path,"wb") as file:
+        file.write(HEADER.pack(MAGIC,capacity,len(entries)))
+        file.write(table)
+
+    return len(entries)
+
+
+def open_book(path):
+    """
+    Return a book reading a book file
+
+    Parameters
+    ----------
+    path : str
+        Path of a file created by build_book
+
+    Returns
+    -------
+    dict
+        Book with the positions of the file
+
+    Raises
+    ------
+    ValueError:
+        If 'path' is not a book file
+    """
+    file = open(path,"rb")
+
+    try:
+        header = file.read(HEADER.size)
+        if len(header) != HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError("ficheiro de abertura invalido")
+
+        magic, capacity, entries = HEADER.unpack(header)
+        if os.fstat(file.fileno()).st_size != HEADER.size + capacity*SLOT.size:
+            raise ValueError("ficheiro de abertura invalido")
+
+        memory_map = mmap.mmap(file.fileno(),0,access = mmap.ACCESS_READ)
+    except BaseException:
+        file.close()
+        raise
+
+    return {"file": file, "mmap": memory_map, "capacity": capacity, "entries": entries}
+
+
+def close_book(book):
+    """
+    Close a book
+
+    Parameters
+    ----------
+    book : dict
+        Book to close
+    """
+    book["mmap"].close()
+    book["file"].close()
+
+
+def lookup(book,goban,stone):
+    """
+    Return the statistics of a position of a book, or None if it is not in it
+
+    The position is found by the hash of the goban in constant expected time
+
+    Parameters
+    ----------
+    book : dict
+        Book where the position is searched for
+    goban : goban
+        Goban of the position
+    stone : stone
+        Stone of the player to move
+
+    Returns
+    -------
+    dict or None
+        Dictionary with the times the position was seen ("seen"), the
+        fraction of those games won by the white ("white_win_rate") and black
+        ("black_win_rate") players, and the most played next moves
+        ("moves"), as triples (intersection or None for a pass, times played,
+        fraction of those games won by the white player), most played first
+    """
+    position_hash = get_hash(goban)
+    n = goban["size"]
+    player = 1 if is_black_stone(stone) else 2
+    capacity = book["capacity"]
+    slot = _first_slot(position_hash,n,player,capacity)
+
+    for _ in range(capacity):
+        fields = SLOT.unpack_from(book["mmap"],HEADER.size + slot*SLOT.size)
+
+        if fields[1] == 0:
+            return None
+
+        if fields[:3] == (position_hash,n,player):
+            seen, white_wins = fields[4], fields[5]
+            moves = tuple(
+                (_to_intersection(fields[i],n),fields[i + 1],fields[i + 2]/fields[i + 1])
+                for i in range(6,6 + 3*fields[3],3)
+            )
+
+            return {
+                "seen": seen,
+                "white_win_rate": white_wins/seen,
+                "black_win_rate": 1 - white_wins/seen,
+                "moves": moves
+            }
+
+        slot = (slot + 1) % capacity
+
+    return None
+
+
+def create_book_player(book,fallback = None,min_seen = 1):
+    """
+    Return a player that replies with the book in known positions
+
+    In a position of the book, the player chooses the legal move played most
+    often, breaking ties by the win rate of its own stone, and otherwise lets
+    'fallback' choose
+
+    Parameters
+    ----------
+    book : dict
+        Book consulted by the player
+    fallback : function, optional
+        Player used outside of the book, passing if not given
+    min_seen : int, optional
+        Minimum number of times a move must have been played to be chosen
+
+    Returns
+    -------
+    function
+        Player, i.e. a function that receives a goban, the player's stone and
+        the hashes of the earlier gobans and returns an intersection or None
+        to pass
+    """
+    def player(goban,stone,history):
+        """Return the move of the book for a player, or the fallback's move"""
+        entry = lookup(book,goban,stone)
+
+        if entry is not None:
+            black = is_black_stone(stone)
+            candidates = [
+                (move, played, (1 - white_rate) if black else white_rate)
+                for move, played, white_rate in entry["moves"]
+                if played >= min_seen and (move is None or is_legal_move(goban,move,stone,None,history))
+            ]
+
+            if candidates:
+                return max(candidates,key = lambda x: (x[1],x[2]))[0]
+
+        if fallback is None:
+            return None
+
+        return fallback(goban,stone,history)
+
+    return player
+
+
+def main(arguments = None):
+    """
+    Build a book file from the SGF files given in the command line
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+    """
+    parser = argparse.ArgumentParser(description = "Build an opening book from SGF game records")
+    parser.add_argument("output",help = "book file to create")
+    parser.add_argument("records",nargs = "+",help = "SGF files or directories with SGF files")
+    parser.add_argument("--depth",type = int,default = 30,help = "moves of each game that enter the book")
+    parser.add_argument("--min-seen",type = int,default = 1,help = "times a position must be seen")
+    arguments = parser.parse_args(arguments)
+
+    paths = []
+    for record in arguments.records:
+        paths += find_records(record) if os.path.isdir(record) else [record]
+
+    games = (game for path in paths for game in read_games(path))
+    entries = build_book(arguments.output,games,arguments.depth,arguments.min_seen)
+    print("{} positions from {} files".format(entries,len(paths)))
+
+
+if __name__ == "__main__":
+    main()
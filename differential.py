@@ -0,0 +1,356 @@
+"""
+Description
+-----------
+This module checks the go module against plain reference implementations of
+its rules and scoring
+
+Every check plays seeded random games, so two runs with the same seed play
+the same games. The reference functions keep the stones in a dictionary of
+intersections and find chains by flooding it, without any of the structures
+of the goban. On every turn, the kind of every move, the legal moves, the
+chains, the territories and the scores of the goban are compared with the
+reference, the goban is checked with go._check_goban, and some moves are
+undone and performed again. Every mismatch is reported, and the command fails
+if there is any. The reference is slow: a 9x9 game takes a few seconds, and
+a 19x19 game more than a minute, so only 9x9 and 13x13 gobans are compared
+by default
+
+Usage
+-----
+python3 differential.py [--games N] [--seed SEED] [--sizes N...] [--round-trips]
+
+Functions
+---------
+reference_chain(stones,n,intersection)
+    Return the chain of an intersection of a reference goban
+reference_move(stones,n,intersection,stone)
+    Return the reference goban after a move, or None if it is a Suicide
+reference_kind(stones,n,intersection,stone,positions)
+    Return the kind of a move on a reference goban
+reference_scores(stones,n)
+    Return each player's score on a reference goban
+compare_game(n,seed,round_trips)
+    Play a seeded random game and return the mismatches with the reference
+main(arguments)
+    Compare random games with the reference and report the mismatches
+"""
+
+import argparse
+import random
+import sys
+
+from go import (
+    _check_goban, calculate_scores, classify_move, create_black_stone,
+    create_empty_goban, create_intersection, create_neutral_stone,
+    create_white_stone, get_adjacent_intersections, get_chain, get_hash,
+    get_legal_moves, get_stone, get_territories, intersection_to_str,
+    is_black_stone, is_legal_move, make_move, sort_intersections,
+    stone_to_str, unmake_move
+)
+
+# Fraction of the turns whose move is undone and performed again
+UNDO_RATE = 0.2
+
+
+def _intersections(n):
+    """Return every intersection of an n x n goban in reading order"""
+    return tuple(create_intersection(chr(ord("A") + column),row) \
+                 for row in range(1,n + 1) for column in range(n))
+
+
+def reference_chain(stones,n,intersection):
+    """
+    Return the chain of an intersection of a reference goban
+
+    Parameters
+    ----------
+    stones : dict
+        Stone of each occupied intersection of the reference goban
+    n : int
+        Dimension of the goban
+    intersection : intersection
+        Intersection whose chain is returned, occupied or free
+
+    Returns
+    -------
+    tuple
+        Intersections connected to 'intersection' through intersections with
+        the same stone, in reading order
+    """
+    last = create_intersection(chr(ord("A") + n - 1),n)
+    stone = stones.get(intersection,create_neutral_stone())
+    chain = {intersection}
+    pending = [intersection]
+
+    while pending:
+        for adjacent in get_adjacent_intersections(pending.pop(),last):
+            if adjacent not in chain and stones.get(adjacent,create_neutral_stone()) == stone:
+                chain.add(adjacent)
+                pending.append(adjacent)
+
+    return sort_intersections(tuple(chain))
+
+
+def _reference_liberties(stones,n,chain):
+    """Return the free intersections adjacent to a chain of a reference goban"""
+    last = create_intersection(chr(ord("A") + n - 1),n)
+
+    return {x for member in chain for x in get_adjacent_intersections(member,last) if x not in stones}
+
+
+def reference_move(stones,n,intersection,stone):
+    """
+    Return the reference goban after a move, or None if it is a Suicide
+
+    Parameters
+    ----------
+    stones : dict
+        Stone of each occupied intersection of the reference goban, which is
+        not modified
+    n : int
+        Dimension of the goban
+    intersection : intersection
+        Free intersection where the stone is placed
+    stone : stone
+        Player's stone
+
+    Returns
+    -------
+    tuple or None
+        Pair with the stones after the move and the number of captured
+        stones, or None if the move is a Suicide
+    """
+    last = create_intersection(chr(ord("A") + n - 1),n)
+    stones = dict(stones)
+    stones[intersection] = stone
+    captured = 0
+
+    # Remove the opposing chains left without liberties, then check the
+    # player's own chain
+    for adjacent in get_adjacent_intersections(intersection,last):
+        if adjacent in stones and stones[adjacent] != stone:
+            chain = reference_chain(stones,n,adjacent)
+            if not _reference_liberties(stones,n,chain):
+                for member in chain:
+                    del stones[member]
+                captured += len(chain)
+
+    if not _reference_liberties(stones,n,reference_chain(stones,n,intersection)):
+        return None
+
+    return stones, captured
+
+
+def reference_kind(stones,n,intersection,stone,positions):
+    """
+    Return the kind of a move on a reference goban
+
+    Parameters
+    ----------
+    stones : dict
+        Stone of each occupied intersection of the reference goban
+    n : int
+        Dimension of the goban
+    intersection : intersection
+        Intersection where the stone is placed
+    stone : stone
+        Player's stone
+    positions : set
+        Frozen sets of the items of the stones of every earlier goban
+
+    Returns
+    -------
+    str
+        "occupied", "suicide", "ko", "capture" or "placement", as returned by
+        classify_move
+    """
+    if intersection in stones:
+        return "occupied"
+
+    result = reference_move(stones,n,intersection,stone)
+    if result is None:
+        return "suicide"
+    if frozenset(result[0].items()) in positions:
+        return "ko"
+
+    return "capture" if result[1] > 0 else "placement"
+
+
+def reference_scores(stones,n):
+    """
+    Return each player's score on a reference goban
+
+    Each player's score is the number of intersections occupied by their
+    stones and of the free regions whose border is only their stones. A goban
+    without stones scores nothing, as in calculate_scores
+
+    Parameters
+    ----------
+    stones : dict
+        Stone of each occupied intersection of the reference goban
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Scores of the white and black player, respectively
+    """
+    last = create_intersection(chr(ord("A") + n - 1),n)
+    white_score = sum(1 for x in stones.values() if x == create_white_stone())
+    black_score = sum(1 for x in stones.values() if x == create_black_stone())
+    counted = set()
+
+    for intersection in _intersections(n):
+        if intersection in stones or intersection in counted:
+            continue
+
+        region = reference_chain(stones,n,intersection)
+        counted.update(region)
+        border = {stones[x] for member in region for x in get_adjacent_intersections(member,last) if x in stones}
+        if border == {create_white_stone()}:
+            white_score += len(region)
+        elif border == {create_black_stone()}:
+            black_score += len(region)
+
+    return (white_score,black_score)
+
+
+def compare_game(n,seed,round_trips = False):
+    """
+    Play a seeded random game and return the mismatches with the reference
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+    seed : int
+        Seed of the generator of the random moves
+    round_trips : bool, optional
+        Whether go._check_goban also performs and undoes every move of each
+        goban, which is much slower
+
+    Returns
+    -------
+    list
+        Description of each mismatch found
+    """
+    rng = random.Random(seed)
+    goban = create_empty_goban(n)
+    stones = {}
+    history = {get_hash(goban)}
+    positions = {frozenset()}
+    stone = create_black_stone()
+    intersections = _intersections(n)
+    mismatches = []
+    passes = 0
+
+    def mismatch(turn,description,value,expected):
+        """Record a mismatch of a value of the goban with the reference"""
+        mismatches.append("{0}x{0} seed {1} turn {2}: {3} is {4!r}, expected {5!r}".format(
+            n,seed,turn,description,value,expected))
+
+    for turn in range(3*n*n):
+        # Kind and legality of every move
+        legal = []
+        for intersection in intersections:
+            move = "({},{})".format(intersection_to_str(intersection),stone_to_str(stone))
+            expected = reference_kind(stones,n,intersection,stone,positions)
+            kind = classify_move(goban,intersection,stone,history)
+            if kind != expected:
+                mismatch(turn,"classify_move" + move,kind,expected)
+
+            is_legal = expected in ("capture","placement")
+            if is_legal_move(goban,intersection,stone,None,history) != is_legal:
+                mismatch(turn,"is_legal_move" + move,not is_legal,is_legal)
+            if is_legal:
+                legal.append(intersection)
+
+        moves = tuple(get_legal_moves(goban,stone,history))
+        if moves != tuple(legal):
+            mismatch(turn,"get_legal_moves",len(moves),len(legal))
+
+        if not legal:
+            passes += 1
+            if passes == 2:
+                break
+        else:
+            passes = 0
+            intersection = rng.choice(legal)
+            undo = make_move(goban,intersection,stone,True)
+            if rng.random() < UNDO_RATE:
+                unmake_move(goban,undo)
+                make_move(goban,intersection,stone)
+            stones = reference_move(stones,n,intersection,stone)[0]
+            history.add(get_hash(goban))
+            positions.add(frozenset(stones.items()))
+
+        # Stones, a chain, territories and scores of the goban after the turn
+        for intersection in intersections:
+            if get_stone(goban,intersection) != stones.get(intersection,create_neutral_stone()):
+                mismatch(turn,"get_stone({})".format(intersection_to_str(intersection)),
+                         get_stone(goban,intersection),stones.get(intersection,create_neutral_stone()))
+
+        intersection = rng.choice(intersections)
+        if get_chain(goban,intersection) != reference_chain(stones,n,intersection):
+            mismatch(turn,"get_chain({})".format(intersection_to_str(intersection)),
+                     get_chain(goban,intersection),reference_chain(stones,n,intersection))
+
+        territories = {reference_chain(stones,n,x) for x in intersections if x not in stones}
+        if set(get_territories(goban)) != territories:
+            mismatch(turn,"get_territories",len(get_territories(goban)),len(territories))
+
+        if calculate_scores(goban) != reference_scores(stones,n):
+            mismatch(turn,"calculate_scores",calculate_scores(goban),reference_scores(stones,n))
+
+        try:
+            _check_goban(goban,round_trips)
+        except ValueError as error:
+            mismatch(turn,"_check_goban",str(error),None)
+
+        if mismatches:
+            break
+
+        stone = create_white_stone() if is_black_stone(stone) else create_black_stone()
+
+    return mismatches
+
+
+def main(arguments = None):
+    """
+    Compare random games with the reference and report the mismatches
+
+    Each game stops at its first turn with mismatches
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+
+    Raises
+    ------
+    SystemExit:
+        If any game does not agree with the reference
+    """
+    parser = argparse.ArgumentParser(description = "Compare the go module with reference rules and scoring")
+    parser.add_argument("--games",type = int,default = 3,help = "random games on each goban")
+    parser.add_argument("--seed",type = int,default = 0,help = "seed of the first game, each following game using the next seed")
+    parser.add_argument("--sizes",type = int,nargs = "+",default = [9,13],help = "dimensions of the gobans")
+    parser.add_argument("--round-trips",action = "store_true",help = "also perform and undo every move of each goban")
+    arguments = parser.parse_args(arguments)
+
+    failures = 0
+    for n in arguments.sizes:
+        for seed in range(arguments.seed,arguments.seed + arguments.games):
+            mismatches = compare_game(n,seed,arguments.round_trips)
+            failures += len(mismatches) > 0
+            for description in mismatches:
+                print(description)
+        print("{0}x{0}: {1} games compared".format(n,arguments.games))
+
+    if failures:
+        sys.exit("{} game(s) do not agree with the reference".format(failures))
+
+
+if __name__ == "__main__":
+    main()
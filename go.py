@@ -28,6 +28,8 @@ str_to_intersection(text)
     Return the intersection represented by the argument
 get_adjacent_intersections(intersection,l)
     Return the intersections adjacent to an intersection
+transform_intersection(intersection,l,transform,inverse)
+    Return the intersection an intersection is taken to by a symmetry of a goban
 sort_intersections(intersections)
     Return intersections sorted in reading order
 create_white_stone()
@@ -60,6 +62,8 @@ get_stone(goban,intersection)
     Return the stone at an intersection
 get_chain(goban,intersection)
     Return the intersections of the chain passing through an intersection
+get_hash(goban)
+    Return the Zobrist hash of the stones of a goban
 place_stone(goban,intersection,stone)
     Place a stone on a goban
 remove_stone(goban,intersection)
@@ -74,30 +78,86 @@ gobans_equal(goban1,goban2)
     Check if the arguments are gobans and are equal
 goban_to_str(goban)
     Return the string representation of a goban
+pack_goban(goban)
+    Return the packed representation of a goban, at 2 bits per point
+unpack_goban(packed)
+    Return the goban of a packed representation
+transform_goban(goban,transform)
+    Return the goban a goban is taken to by a symmetry
+canonical_goban(goban)
+    Return the canonical goban of a goban and the symmetry that leads to it
+get_canonical_hash(goban)
+    Return the hash of the canonical goban of a goban
 get_intersections(goban,stone)
     Return all intersections of a goban occupied by a given stone
 get_territories(goban)
     Return the territories of a goban
+get_pass_alive(goban,stone)
+    Return the pass-alive chains of a player and the regions they control
 get_different_adjacents(goban,intersections)
     Return the different adjacent intersections of intersections
-make_move(goban,intersection,stone)
+make_move(goban,intersection,stone,undo)
     Place a player's stone on an intersection of a goban, remove the opposing
     player's stones belonging to adjacent chains that have no liberties,
     and return the modified goban
+unmake_move(goban,undo)
+    Undo a move performed by make_move and return the restored goban
 get_player_stones(goban)
     Return the number of intersections occupied by each player's stones
 calculate_scores(goban)
     Return each player's score
-is_legal_move(goban,intersection,stone,previous_goban)
-    Perform a move on a copy of a goban and check if it is legal
-player_turn(goban,stone,previous_goban)
+calculate_settled_scores(goban)
+    Return the points of each player's score that can no longer change
+create_score_tracker(goban)
+    Return a score tracker of a goban
+get_tracked_scores(tracker)
+    Return each player's score, updating a score tracker
+is_legal_move(goban,intersection,stone,previous_goban,history)
+    Check if a move on a goban is legal
+classify_move(goban,intersection,stone,history)
+    Return the kind of a move on a goban, without performing it
+get_legal_moves(goban,stone,history,bitmask)
+    Return all the legal moves of a player on a goban
+playout(goban,to_move,rng,history,patterns,stop_settled)
+    Play random moves on a copy of a goban until both players pass and
+    return each player's score
+player_turn(goban,stone,previous_goban,history)
     Offer a player the option to pass or place their stone on an intersection
     and return whether the player passed
-go(n,white_stones,black_stones)
+terminal_player(goban,stone,history)
+    Return the move the player at the terminal chooses, or None to pass
+create_scripted_player(moves)
+    Return a player that performs a list of moves in order
+create_random_player(seed)
+    Return a player that performs uniformly random legal moves
+play_game(goban,black_player,white_player,history,on_turn,max_moves)
+    Play a game between two players without the terminal and return its result
+go(n,white_stones,black_stones,white_player,black_player)
     Play GO and return whether the white player won
+instrumentation()
+    Enable the instrumentation of the go module while a with block runs
+get_stats()
+    Return a snapshot of the statistics of instrumentation
 """
 
+import array
+import contextlib
+import copy
+import itertools
+import random
+import threading
+import time
+
 # Intersection
+# Every intersection is created once, in the table below, so that the same
+# intersection is always represented by the same object and can be fetched
+# without validating its column and row again
+_INTERSECTIONS = {
+    (chr(ord("A") + column),row): (chr(ord("A") + column),row)
+    for row in range(1,20) for column in range(19)
+}
+
+
 # Constructor
 def create_intersection(column,row):
     """
@@ -131,7 +191,7 @@ def create_intersection(column,row):
     ):
         raise ValueError("create_intersection: argumentos invalidos")
 
-    return (column,row)
+    return _INTERSECTIONS[(column,row)]
 
 
 # Selectors
@@ -216,6 +276,10 @@ def intersections_equal(intersection1,intersection2):
     bool
         True if valid, False otherwise
     """
+    # An intersection fetched from the table is compared by identity
+    if intersection1 is intersection2:
+        return is_intersection(intersection1)
+
     if (
         not is_intersection(intersection1) or
         not is_intersection(intersection2) or
@@ -282,8 +346,13 @@ def str_to_intersection(text):
     -------
     intersection
         Represented intersection
+
+    Raises
+    ------
+    ValueError:
+        If 'text' does not represent an intersection
     """
-    return (text[0],int(text[1:]))
+    return create_intersection(text[0],int(text[1:]))
 
 
 # High-Level Functions
@@ -305,27 +374,73 @@ def get_adjacent_intersections(intersection,l):
     """
     column = get_col(intersection)
     row = get_row(intersection)
+    size = get_row(l)
+
+    # Use the precomputed adjacent points of the gobans' intersections
+    if get_col(l) == chr(ord("A") + size - 1) and size in _NEIGHBOURS:
+        table = _POINT_INTERSECTIONS[size]
+        return tuple(table[x] for x in _NEIGHBOURS[size][(row - 1)*size + ord(column) - ord("A")])
+
     adjacents = ()
 
     # Determine the intersection below if it exists
     if row - 1 > 0:
-        adjacents += (create_intersection(column,row - 1),)
+        adjacents += (_INTERSECTIONS[(column,row - 1)],)
 
     # Determine the intersection to the left if it exists
     if chr(ord(column) - 1) >= 'A':
-        adjacents += (create_intersection(chr(ord(column) - 1),row),)
+        adjacents += (_INTERSECTIONS[(chr(ord(column) - 1),row)],)
 
     # Determine the intersection to the right if it exists
     if chr(ord(column) + 1) <= get_col(l):
-        adjacents += (create_intersection(chr(ord(column) + 1),row),)
+        adjacents += (_INTERSECTIONS[(chr(ord(column) + 1),row)],)
     
     # Determine the intersection above if it exists
     if row + 1 <= get_row(l):
-        adjacents += (create_intersection(column,row + 1),)
+        adjacents += (_INTERSECTIONS[(column,row + 1)],)
 
     return adjacents
 
 
+def transform_intersection(intersection,l,transform,inverse = False):
+    """
+    Return the intersection an intersection is taken to by a symmetry of a goban
+
+    Parameters
+    ----------
+    intersection : intersection
+        Intersection to transform
+    l : intersection
+        Top-right intersection of the goban to which 'intersection' belongs
+    transform : int
+        Symmetry from 0 to 7, as given by canonical_goban: the goban is
+        reflected across its central column if bit 2 is set, and then rotated
+        counterclockwise by 90 degrees as many times as the two lower bits
+    inverse : bool, optional
+        If True, apply the symmetry that undoes 'transform'
+
+    Returns
+    -------
+    intersection
+        Transformed intersection
+
+    Raises
+    ------
+    ValueError:
+        If 'transform' is not an integer from 0 to 7
+    """
+    if not isinstance(transform,int) or not 0 <= transform <= 7:
+        raise ValueError("transform_intersection: argumentos invalidos")
+
+    if inverse:
+        transform = _INVERSE_TRANSFORMS[transform]
+
+    column, row = _transform_point(ord(get_col(intersection)) - ord("A"),get_row(intersection) - 1,
+                                   get_row(l),transform)
+
+    return _INTERSECTIONS[(chr(ord("A") + column),row + 1)]
+
+
 def sort_intersections(intersections):
     """
     Return intersections sorted in reading order
@@ -483,6 +598,434 @@ def is_player_stone(stone):
 
 
 # Goban
+# A goban is represented by a dictionary with:
+# -> "size": dimension n of the goban
+# -> "board": bytearray with the code of the stone at each point, where the
+#    point of the intersection at column c (from 0) and row r is (r - 1)*n + c,
+#    so that points follow the reading order
+# -> "chains": array with, for each point occupied by a player's stone, the
+#    head of its chain, i.e. the point of one of the stones of the chain, or -1
+#    for free points, of the smallest type that holds the points
+# -> "next": array with, for each point occupied by a player's stone, the
+#    point of the next stone of its chain, the stones of each chain forming a
+#    circular list
+# -> "records": dictionary with the record of each chain, indexed by its
+#    head, packing the number of its stones in the lowest 9 bits and, above
+#    them, its pseudo-liberties, i.e. the pairs of a stone of the chain and a
+#    free point next to it: their number in the lowest 11 bits, the sum of
+#    their points in the next 19 bits and the sum of the squares of their
+#    points above them. The chain has no liberties if the number is 0, and
+#    the single liberty p if the liberties are the number times those of p
+#    alone, since only equal points have a sum and a sum of squares such that
+#    the number times the sum of the squares is the square of the sum
+# -> "stones": bitmasks of the points occupied by each player's stone,
+#    indexed by its code, where point p is bit p (the entry of the free points
+#    is not kept and stays 0)
+# -> "counts": number of points occupied by each stone, indexed by its code
+# -> "hash": Zobrist hash of the stones of the goban
+# -> "patterns": only in the gobans of _scratch_goban, list with the code of
+#    the 3x3 square around each point, with 2 bits for each of the 8 points
+#    around it in reading order, holding the code of the stone there or 3 if
+#    it is off the goban, kept up to date with the board
+# Each goban only holds a few bytes per point and per chain. Whatever can be
+# derived from its size or its board is left out of it: the intersection of
+# each point (_POINT_INTERSECTIONS), the adjacent points of each point
+# (_NEIGHBOURS), the points of the 3x3 square around each point, paired with
+# the shift of the point's code in their patterns (_SURROUNDINGS) and the
+# Zobrist keys of each stone at each point (_ZOBRIST_KEYS) are computed once
+# per size, and the labelling of the regions when needed (_label_regions)
+
+# Codes of the stones on the board
+_NEUTRAL, _BLACK, _WHITE = 0, 1, 2
+_STONES = (create_neutral_stone(),create_black_stone(),create_white_stone())
+_CODES = {stone: code for code, stone in enumerate(_STONES)}
+
+
+def _build_neighbours(n):
+    """
+    Return the adjacent points of each point of an n x n goban
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Tuple with the adjacent points of each point, in reading order
+    """
+    neighbours = ()
+
+    for point in range(n*n):
+        row, column = divmod(point,n)
+        adjacents = ()
+
+        if row > 0:
+            adjacents += (point - n,)
+        if column > 0:
+            adjacents += (point - 1,)
+        if column < n - 1:
+            adjacents += (point + 1,)
+        if row < n - 1:
+            adjacents += (point + n,)
+
+        neighbours += (adjacents,)
+
+    return neighbours
+
+
+# Offsets (row, column) of the points around a point, in the order of the
+# 2-bit fields of its pattern
+_AROUND = ((-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1))
+
+# Code of the points off the goban in the patterns
+_EDGE = 3
+
+
+def _build_surroundings(n):
+    """
+    Return the points around each point of an n x n goban and their shifts
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Tuple with, for each point, the pairs (point around it, shift of the
+        2-bit field of the point in the pattern of the point around it)
+    """
+    surroundings = ()
+
+    for point in range(n*n):
+        row, column = divmod(point,n)
+        around = ()
+
+        # The point is at the opposite offset of each point around it
+        for i, (row_offset, column_offset) in enumerate(_AROUND):
+            if 0 <= row + row_offset < n and 0 <= column + column_offset < n:
+                around += ((point + row_offset*n + column_offset,2*(7 - i)),)
+
+        surroundings += (around,)
+
+    return surroundings
+
+
+def _build_empty_patterns(n):
+    """
+    Return the pattern of each point of an empty n x n goban
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Tuple with the pattern of each point, where only the points off the
+        goban are set
+    """
+    patterns = ()
+
+    for point in range(n*n):
+        row, column = divmod(point,n)
+        pattern = 0
+
+        for i, (row_offset, column_offset) in enumerate(_AROUND):
+            if not (0 <= row + row_offset < n and 0 <= column + column_offset < n):
+                pattern |= _EDGE << 2*i
+
+        patterns += (pattern,)
+
+    return patterns
+
+
+def _build_eye_table():
+    """
+    Return the players of whom a free point is an eye, for every pattern
+
+    A point is an eye of a player if all its adjacent points are occupied by
+    the player's stones and the opposing player occupies fewer than two of its
+    diagonally adjacent points, or none of them on the edge of the goban
+
+    Returns
+    -------
+    bytearray
+        Bitwise or of the codes of the players of whom a free point with each
+        pattern is an eye
+    """
+    table = bytearray(1 << 16)
+
+    # Only the patterns whose adjacent points hold the player's stones or are
+    # off the goban are enumerated
+    for code in (_BLACK,_WHITE):
+        for adjacents in itertools.product((code,_EDGE),repeat = 4):
+            if adjacents == 4*(_EDGE,):
+                continue
+
+            for diagonals in itertools.product((_NEUTRAL,_BLACK,_WHITE,_EDGE),repeat = 4):
+                opponents = diagonals.count(_BLACK + _WHITE - code)
+                if opponents < (1 if _EDGE in diagonals else 2):
+                    fields = diagonals[:1] + adjacents[:1] + diagonals[1:2] + adjacents[1:3] + \
+                             diagonals[2:3] + adjacents[3:] + diagonals[3:]
+                    table[sum(x << 2*i for i, x in enumerate(fields))] = code
+
+    return table
+
+
+# Shapes of the 3x3 squares where the playout policy plays the centre, with
+# their weights. X and O are the stones of either player, x and o are any
+# point but X and O, respectively, ? is any point and the spaces are off the
+# goban. Every symmetry and exchange of colours of a shape also matches
+_PATTERN_SHAPES = (
+    (("XOX",
+      "...",
+      "???"),3),    # Hane enclosing a stone
+    (("XO.",
+      "...",
+      "?.?"),2),    # Hane that cannot be cut
+    (("XO?",
+      "X..",
+      "x.?"),2),    # Hane around the corner of a stone
+    ((".O.",
+      "X..",
+      "..."),1),    # Diagonal attachment
+    (("XO?",
+      "O.o",
+      "?o?"),3),    # Cut that is not protected
+    (("XO?",
+      "O.X",
+      "???"),2),    # Cut after a peep
+    (("?X?",
+      "O.O",
+      "ooo"),3),    # Pushing through between two stones
+    (("OX?",
+      "o.O",
+      "???"),2),    # Cut of a knight's move
+    (("X.?",
+      "O.?",
+      "   "),1),    # Chasing along the edge
+    (("OX?",
+      "X.O",
+      "   "),2),    # Blocking a cut on the edge
+    (("?X?",
+      "x.O",
+      "   "),2),    # Blocking a connection on the edge
+    (("?XO",
+      "x.x",
+      "   "),1),    # Descending to the edge
+    (("?OX",
+      "X.O",
+      "   "),2)     # Cutting on the edge
+)
+
+
+def _expand_shape(shape):
+    """
+    Return the patterns matching a shape of _PATTERN_SHAPES
+
+    Parameters
+    ----------
+    shape : tuple
+        Three strings with the rows of the shape
+
+    Returns
+    -------
+    set
+        Patterns of the shape, its symmetries and their exchanges of colours
+    """
+    options = {
+        ".": (_NEUTRAL,), "X": (_BLACK,), "O": (_WHITE,), " ": (_EDGE,),
+        "x": (_NEUTRAL,_WHITE,_EDGE), "o": (_NEUTRAL,_BLACK,_EDGE),
+        "?": (_NEUTRAL,_BLACK,_WHITE,_EDGE)
+    }
+    swapped = str.maketrans("XOxo","OXox")
+    patterns = set()
+
+    for transform in range(16):
+        rows = shape
+        if transform & 8:
+            rows = tuple(x.translate(swapped) for x in rows)
+        if transform & 4:
+            rows = tuple(x[::-1] for x in rows)
+        for _ in range(transform & 3):
+            rows = tuple("".join(rows[2 - j][i] for j in range(3)) for i in range(3))
+
+        # Every combination of the options of the points around the centre
+        fields = "".join(rows)[:4] + "".join(rows)[5:]
+        partial = {0}
+        for i, field in enumerate(fields):
+            partial = {x | code << 2*i for x in partial for code in options[field]}
+        patterns |= partial
+
+    return patterns
+
+
+def _build_pattern_weights():
+    """
+    Return the weight of playing the centre of every pattern
+
+    Returns
+    -------
+    bytearray
+        Largest weight among the shapes of _PATTERN_SHAPES matching each
+        pattern, or 0 if none matches
+    """
+    table = bytearray(1 << 16)
+
+    # The heavier shapes are written last, replacing the lighter ones
+    for shape, weight in sorted(_PATTERN_SHAPES,key = lambda x: x[1]):
+        for pattern in _expand_shape(shape):
+            table[pattern] = weight
+
+    return table
+
+
+def _build_zobrist_keys(n):
+    """
+    Return the Zobrist keys of each stone at each point of an n x n goban
+
+    The generator is seeded so that hashes are the same across runs and processes
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Tuple indexed by stone code with the 64-bit key of that stone at each
+        point. The keys of the neutral stone are 0
+    """
+    generator = random.Random(n)
+
+    return ((n*n)*(0,),) + tuple(tuple(generator.getrandbits(64) for point in range(n*n)) \
+                                 for code in (_BLACK,_WHITE))
+
+
+def _transform_point(column,row,n,transform):
+    """
+    Return the coordinates of a point of an n x n goban after a symmetry
+
+    Parameters
+    ----------
+    column : int
+        Column of the point, from 0
+    row : int
+        Row of the point, from 0
+    n : int
+        Dimension of the goban
+    transform : int
+        Symmetry from 0 to 7: the goban is reflected across its central
+        column if bit 2 is set, and then rotated counterclockwise by 90
+        degrees as many times as the two lower bits
+
+    Returns
+    -------
+    tuple
+        Column and row, from 0, of the transformed point
+    """
+    if transform & 4:
+        column = n - 1 - column
+
+    for _ in range(transform & 3):
+        column, row = n - 1 - row, column
+
+    return column, row
+
+
+def _build_transforms(n):
+    """
+    Return the point each point of an n x n goban is taken to by each symmetry
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Tuple indexed by symmetry with the transformed point of each point
+    """
+    transforms = ()
+
+    for transform in range(8):
+        points = ()
+        for point in range(n*n):
+            column, row = _transform_point(point % n,point // n,n,transform)
+            points += (row*n + column,)
+        transforms += (points,)
+
+    return transforms
+
+
+_NEIGHBOURS = {n: _build_neighbours(n) for n in (9,13,19)}
+_SURROUNDINGS = {n: _build_surroundings(n) for n in (9,13,19)}
+_EMPTY_PATTERNS = {n: tuple(_build_empty_patterns(n)) for n in (9,13,19)}
+_POINT_TYPES = {9: "b", 13: "h", 19: "h"}
+_EMPTY_CHAINS = {n: array.array(_POINT_TYPES[n],(n*n)*[-1]) for n in (9,13,19)}
+_EMPTY_NEXT = {n: array.array(_POINT_TYPES[n],(n*n)*[0]) for n in (9,13,19)}
+_LIBERTY_UNITS = [(1 + (x << 11) + (x*x << 30)) << 9 for x in range(19*19)]
+_LABELS = {}
+_LABELS_SIZE = 8
+_PATTERN_EYES = _build_eye_table()
+_PATTERN_WEIGHTS = _build_pattern_weights()
+_ZOBRIST_KEYS = {n: _build_zobrist_keys(n) for n in (9,13,19)}
+_TRANSFORMS = {n: _build_transforms(n) for n in (9,13,19)}
+_INVERSE_TRANSFORMS = tuple(
+    next(x for x in range(8) if all(_TRANSFORMS[9][x][point] == i for i, point in enumerate(_TRANSFORMS[9][t])))
+    for t in range(8)
+)
+_POINT_INTERSECTIONS = {
+    n: tuple(_INTERSECTIONS[(chr(ord("A") + point % n),point // n + 1)] for point in range(n*n))
+    for n in (9,13,19)
+}
+
+
+def _point(goban,intersection):
+    """
+    Return the point of an intersection of a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to which the intersection belongs
+    intersection : intersection
+        Intersection to convert
+
+    Returns
+    -------
+    int
+        Index of 'intersection' on the board of 'goban'
+    """
+    return (get_row(intersection) - 1)*goban["size"] + ord(get_col(intersection)) - ord("A")
+
+
+def _intersection(goban,point):
+    """
+    Return the intersection of a point of a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to which the point belongs
+    point : int
+        Index of the point on the board of 'goban'
+
+    Returns
+    -------
+    intersection
+        Intersection of 'point'
+    """
+    return _POINT_INTERSECTIONS[goban["size"]][point]
+
+
 # Constructors
 def create_empty_goban(n):
     """
@@ -506,7 +1049,16 @@ def create_empty_goban(n):
     if not isinstance(n,int) or (n != 9 and n != 13 and n != 19):
         raise ValueError("create_empty_goban: argumento invalido")
     
-    return [n*[create_neutral_stone()] for column in range(n)]
+    return {
+        "size": n,
+        "board": bytearray(n*n),
+        "chains": _EMPTY_CHAINS[n][:],
+        "next": _EMPTY_NEXT[n][:],
+        "records": {},
+        "stones": [0,0,0],
+        "counts": [n*n,0,0],
+        "hash": 0
+    }
 
 
 def create_goban(n,white_intersections,black_intersections):
@@ -592,23 +1144,19 @@ def copy_goban(goban):
     goban
         Copy of 'goban'
     """
-    goban_copy = []
+    if _STATS is not None and (threading.get_ident(),"copy_goban") not in _MEASURED:
+        return _measure("copy_goban",copy_goban,goban)
 
-    for column in goban: 
-        column_copy = []   
-
-        # Copy the stones from the 'column' of the goban
-        for stone in column:
-            if is_white_stone(stone):
-                column_copy.append(create_white_stone())
-            elif is_black_stone(stone):
-                column_copy.append(create_black_stone())
-            else:
-                column_copy.append(create_neutral_stone())
-
-        goban_copy += [column_copy]
-
-    return goban_copy
+    return {
+        "size": goban["size"],
+        "board": bytearray(goban["board"]),
+        "chains": goban["chains"][:],
+        "next": goban["next"][:],
+        "records": dict(goban["records"]),
+        "stones": list(goban["stones"]),
+        "counts": list(goban["counts"]),
+        "hash": goban["hash"]
+    }
 
 # Selectors
 def get_last_intersection(goban):
@@ -625,7 +1173,7 @@ def get_last_intersection(goban):
     intersection
         Last intersection of 'goban'
     """
-    return create_intersection(chr(ord("A") + len(goban) - 1),len(goban))
+    return _POINT_INTERSECTIONS[goban["size"]][-1]
 
 
 def get_stone(goban,intersection):
@@ -644,7 +1192,7 @@ def get_stone(goban,intersection):
     stone
         Stone at 'intersection'
     """
-    return goban[ord(get_col(intersection)) - ord("A")][get_row(intersection) - 1]
+    return _STONES[goban["board"][_point(goban,intersection)]]
 
 
 def get_chain(goban,intersection):
@@ -664,160 +1212,952 @@ def get_chain(goban,intersection):
         Intersections of the stones in the chain passing through 'intersection'
         in reading order
     """
-    stone = get_stone(goban,intersection)
-    chain = (intersection,)
+    if _STATS is not None and (threading.get_ident(),"get_chain") not in _MEASURED:
+        return _measure("get_chain",get_chain,goban,intersection)
 
-    # Get the intersections adjacent to each element of 'chain'
-    i = 0
-    while i < len(chain):
-        adjacent_intersections = get_adjacent_intersections(chain[i],get_last_intersection(goban))
+    point = _point(goban,intersection)
 
-        for adjacent_intersection in adjacent_intersections:
-            # Add 'adjacent_intersection' to 'chain' if it doesn't already belong
-            # to it and is occupied by a stone equal to the one at 'intersection'
-            if (
-                stones_equal(stone,get_stone(goban,adjacent_intersection)) and 
-                adjacent_intersection not in chain
-            ):
-                chain += (adjacent_intersection,) 
-                
-        i += 1
+    # Chains of player stones are kept up to date by the goban itself, and
+    # regions of free points are taken from the labelling if it is up to date
+    if goban["chains"][point] >= 0:
+        chain = sorted(_chain_points(goban,point))
+    elif (goban["size"],goban["hash"]) in _LABELS:
+        labels, regions = _LABELS[(goban["size"],goban["hash"])]
+        chain = regions[labels[point]]
+    else:
+        chain = sorted(_get_region(goban,point))
 
-    return sort_intersections(chain)
+    return tuple(_intersection(goban,x) for x in chain)
 
 
-# Modifiers
-def place_stone(goban,intersection,stone):
+def get_hash(goban):
     """
-    Place a stone on a goban
+    Return the Zobrist hash of the stones of a goban
+
+    Equal gobans have equal hashes, and different gobans have different
+    hashes except with negligible probability
 
     Parameters
     ----------
     goban : goban
-        Goban where the stone will be placed
-    intersection : intersection
-        Intersection to occupy with the stone
-    stone : stone
-        Stone to place
-    
+        Goban to analyse
+
     Returns
     -------
-    goban
-        Modified goban
+    int
+        64-bit hash of the stones of 'goban'
     """
-    goban[ord(get_col(intersection)) - ord("A")][get_row(intersection)-1] = stone
-
-    return goban
+    return goban["hash"]
 
 
-def remove_stone(goban,intersection):
+# Auxiliary Functions
+# The functions below work directly on the points of a goban and keep its
+# chains and hash up to date in time proportional to the affected chains
+def _get_region(goban,point):
     """
-    Remove a stone from a goban
+    Return the points connected to a point through points with the same stone
 
     Parameters
     ----------
     goban : goban
-        Goban from which the stone will be removed
-    intersection : intersection
-        Intersection whose stone will be removed
+        Goban to which the point belongs
+    point : int
+        Point whose region is to be obtained
 
     Returns
     -------
-    goban
-        Modified goban
+    set
+        Points of the region of 'point'
     """
-    place_stone(goban,intersection,create_neutral_stone())
+    board = goban["board"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    code = board[point]
+    region = {point}
+    pending = [point]
 
-    return goban
+    while pending:
+        for adjacent in neighbours[pending.pop()]:
+            if board[adjacent] == code and adjacent not in region:
+                region.add(adjacent)
+                pending.append(adjacent)
 
+    return region
 
-def remove_chain(goban,intersections_tuple):
+
+def _label_regions(goban):
     """
-    Remove stones from intersections of a goban
+    Return the labelling of the regions of a goban
+
+    A region is a chain of stones or of free points. The regions are labelled
+    in a single pass over the points in reading order, joining each point
+    with the points to its left and below it in a union-find structure whose
+    roots are the smallest points of each region. The labellings of the
+    last few gobans are kept in _LABELS, indexed by their size and hash
 
     Parameters
     ----------
     goban : goban
-        Goban from which the stones will be removed
-    intersections_tuple : tuple
-        Intersections whose stones will be removed
+        Goban whose regions are to be labelled
 
     Returns
     -------
-    goban
-        Modified goban
-    """
-    for intersection in intersections_tuple:
-        remove_stone(goban,intersection)
-    
-    return goban
+    tuple
+        Pair with a list of the label of each point, which is the first point
+        of its region in reading order, and a dictionary with the points of
+        each region in reading order, indexed by label in reading order
+    """
+    key = (goban["size"],goban["hash"])
+    if key in _LABELS:
+        return _LABELS[key]
+
+    board = goban["board"]
+    size = goban["size"]
+    parent = list(range(len(board)))
+
+    for point in range(len(board)):
+        code = board[point]
+        left = point % size > 0 and board[point - 1] == code
+        below = point >= size and board[point - size] == code
+
+        # Join 'point' with the point to its left and the point below it
+        if left and below:
+            root = parent[point - 1]
+            while parent[root] != root:
+                root = parent[root]
+            below_root = parent[point - size]
+            while parent[below_root] != below_root:
+                parent[below_root] = parent[parent[below_root]]
+                below_root = parent[below_root]
+
+            if root < below_root:
+                parent[below_root] = parent[point] = root
+            else:
+                parent[root] = parent[point] = below_root
+        elif left:
+            parent[point] = parent[point - 1]
+        elif below:
+            parent[point] = parent[point - size]
+
+    # Points are visited in reading order, so the root of each point has
+    # already been found when the point is reached
+    labels = parent
+    regions = {}
+    for point in range(len(board)):
+        labels[point] = labels[labels[point]]
+        if labels[point] == point:
+            regions[point] = [point]
+        else:
+            regions[labels[point]].append(point)
 
+    # Forget the oldest labelling when the cache is full
+    if len(_LABELS) >= _LABELS_SIZE:
+        del _LABELS[next(iter(_LABELS))]
+    _LABELS[key] = (labels,regions)
 
-# Recognizers
-def is_goban(arg):
+    return labels, regions
+
+
+def _scratch_goban(goban):
     """
-    Check if the argument is a goban ADT
+    Return a copy of a goban holding its chains in lists, with its patterns
+
+    Gobans keep their chains in arrays and leave their patterns out to stay
+    small, but reading and writing lists is faster and the patterns make
+    checking eyes and shapes cheap, so a goban that is only used for a while
+    and played on many times, like the one of a playout, is worth converting
 
     Parameters
     ----------
-    arg : universal
-        Parameter to check
+    goban : goban
+        Goban to copy
 
     Returns
     -------
-    bool
-        True if valid, False otherwise
+    goban
+        Copy of 'goban' for the private functions of the module
     """
-    if not isinstance(arg,list) or (len(arg) != 9 and len(arg) != 13 and len(arg) != 19):
-        return False
-    
-    for element in arg:
-        if not isinstance(element,list) or len(element) != len(arg):
-            return False
-        
-        for sub_element in element:
-            if not is_stone(sub_element):
-                return False
-    
-    return True
+    scratch = copy_goban(goban)
+    scratch["chains"] = scratch["chains"].tolist()
+    scratch["next"] = scratch["next"].tolist()
 
+    patterns = list(_EMPTY_PATTERNS[goban["size"]])
+    surroundings = _SURROUNDINGS[goban["size"]]
+    for code in (_BLACK,_WHITE):
+        for point in _mask_points(goban["stones"][code]):
+            for around, shift in surroundings[point]:
+                patterns[around] ^= code << shift
+    scratch["patterns"] = patterns
 
-def is_valid_intersection(goban,intersection):
+    return scratch
+
+
+def _chain_points(goban,point):
     """
-    Check if an intersection is valid within a goban
+    Return the points of the stones of the chain of an occupied point
 
     Parameters
     ----------
     goban : goban
-        Goban to consider
-    intersection : intersection
-        Intersection to check
-        
+        Goban to which the point belongs
+    point : int
+        Point occupied by a player's stone
+
     Returns
     -------
-    bool
-        True if valid, False otherwise
+    list
+        Points of the chain, starting with 'point' and following the
+        circular list of the chain
     """
-    if (
-        not get_col(intersection) <= get_col(get_last_intersection(goban)) or
-        not get_row(intersection) <= get_row(get_last_intersection(goban))
-    ):
-        return False
-    
-    return True
+    following = goban["next"]
+    points = [point]
+    member = following[point]
 
+    while member != point:
+        points.append(member)
+        member = following[member]
 
-# Test
-def gobans_equal(goban1,goban2):
+    return points
+
+
+def _chain_liberties(goban,point):
     """
-    Check if the arguments are gobans and are equal
+    Return the liberties of the chain of an occupied point
+
+    Only the record of the pseudo-liberties of each chain is kept by the
+    goban, so the liberties are found by going through the stones of the chain
 
     Parameters
     ----------
-    goban1 : universal
-        First parameter to check
-    goban2 : universal
-        Second parameter to check
+    goban : goban
+        Goban to which the point belongs
+    point : int
+        Point occupied by a player's stone
+
+    Returns
+    -------
+    set
+        Free points adjacent to the chain
+    """
+    board = goban["board"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+
+    return {x for member in _chain_points(goban,point) for x in neighbours[member] if board[x] == _NEUTRAL}
+
+
+def _mask_points(mask):
+    """
+    Return the points of the bits set in a bitmask
+
+    Parameters
+    ----------
+    mask : int
+        Bitmask where point p is bit p
+
+    Returns
+    -------
+    list
+        Points of the bits set in 'mask', in increasing order
+    """
+    points = []
+
+    while mask:
+        low = mask & -mask
+        points.append(low.bit_length() - 1)
+        mask ^= low
+
+    return points
+
+
+def _add_stone(goban,point,code):
+    """
+    Occupy a free point with a player's stone and update the chains
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the stone will be placed
+    point : int
+        Free point to occupy with the stone
+    code : int
+        Code of the player's stone to place
+    """
+    board = goban["board"]
+    chains = goban["chains"]
+    following = goban["next"]
+    records = goban["records"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    counts = goban["counts"]
+    board[point] = code
+    goban["stones"][code] |= 1 << point
+    counts[code] += 1
+    counts[_NEUTRAL] -= 1
+    goban["hash"] ^= _ZOBRIST_KEYS[goban["size"]][code][point]
+    patterns = goban.get("patterns")
+    if patterns is not None:
+        for around, shift in _SURROUNDINGS[goban["size"]][point]:
+            patterns[around] ^= code << shift
+
+    chains[point] = following[point] = point
+    units = _LIBERTY_UNITS
+    unit = units[point]
+    record = 1
+    friends = []
+
+    for adjacent in neighbours[point]:
+        head = chains[adjacent]
+
+        if head < 0:
+            record += units[adjacent]
+
+        # The stone takes a pseudo-liberty from every adjacent stone
+        else:
+            records[head] -= unit
+            if board[adjacent] == code and head not in friends:
+                friends.append(head)
+
+    records[point] = record
+
+    # Merge the chains of the same player, relabelling the smaller one and
+    # joining their circular lists
+    head = point
+    for other in friends:
+        if records[other] & 0x1FF < records[head] & 0x1FF:
+            other, head = head, other
+
+        member = other
+        while True:
+            chains[member] = head
+            member = following[member]
+            if member == other:
+                break
+        following[other], following[head] = following[head], following[other]
+        records[head] += records.pop(other)
+
+
+def _remove_stones(goban,points):
+    """
+    Free occupied points of a goban and update the chains
+
+    Only the chains that contained 'points' are rebuilt, so removing a whole
+    chain costs time proportional to its size
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which the stones will be removed
+    points : iterable
+        Points occupied by players' stones
+    """
+    board = goban["board"]
+    chains = goban["chains"]
+    following = goban["next"]
+    records = goban["records"]
+    keys = _ZOBRIST_KEYS[goban["size"]]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    patterns = goban.get("patterns")
+    surroundings = _SURROUNDINGS[goban["size"]]
+    stones = goban["stones"]
+    counts = goban["counts"]
+    units = _LIBERTY_UNITS
+    points = list(points)
+
+    # Collect the stones of the chains of the points before freeing them
+    affected = {}
+    for point in points:
+        head = chains[point]
+        if head not in affected:
+            affected[head] = _chain_points(goban,point)
+            del records[head]
+
+    for point in points:
+        code = board[point]
+        chains[point] = -1
+        stones[code] ^= 1 << point
+        counts[code] -= 1
+        counts[_NEUTRAL] += 1
+        goban["hash"] ^= keys[code][point]
+        if patterns is not None:
+            for around, shift in surroundings[point]:
+                patterns[around] ^= code << shift
+        board[point] = _NEUTRAL
+
+    # Split what remains of each affected chain into its new chains
+    rebuilt = set()
+    for members in affected.values():
+        remaining = {x for x in members if board[x] != _NEUTRAL}
+        while remaining:
+            head = remaining.pop()
+            chains[head] = following[head] = head
+            record = 1
+            pending = [head]
+
+            while pending:
+                member = pending.pop()
+                for adjacent in neighbours[member]:
+                    if adjacent in remaining:
+                        remaining.discard(adjacent)
+                        chains[adjacent] = head
+                        following[adjacent], following[head] = following[head], adjacent
+                        record += 1
+                        pending.append(adjacent)
+                    elif board[adjacent] == _NEUTRAL:
+                        record += units[adjacent]
+
+            records[head] = record
+            rebuilt.add(head)
+
+    # Every freed point is a pseudo-liberty of the other stones next to it
+    for point in points:
+        for adjacent in neighbours[point]:
+            head = chains[adjacent]
+            if head >= 0 and head not in rebuilt:
+                records[head] += units[point]
+
+
+def _play(goban,point,code):
+    """
+    Occupy a free point with a player's stone and capture the opposing
+    player's adjacent chains that are left without liberties
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move is performed
+    point : int
+        Free point to occupy with the stone
+    code : int
+        Code of the player's stone to place
+
+    Returns
+    -------
+    list
+        Captured points
+    """
+    board = goban["board"]
+    chains = goban["chains"]
+    records = goban["records"]
+    captured = []
+
+    _add_stone(goban,point,code)
+
+    for adjacent in _NEIGHBOURS[goban["size"]][point]:
+        if board[adjacent] != _NEUTRAL and board[adjacent] != code and records[chains[adjacent]] >> 9 == 0:
+            stones = _chain_points(goban,adjacent)
+            captured.extend(stones)
+            _remove_stones(goban,stones)
+
+    if _STATS is not None and captured:
+        _STATS["captures"] += 1
+        _STATS["captured_stones"] += len(captured)
+
+    return captured
+
+
+def _make_move(goban,point,code):
+    """
+    Occupy a point with a stone, capture the opposing player's adjacent chains
+    that are left without liberties and return the undo record of the move
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move is performed
+    point : int
+        Point to occupy with the stone
+    code : int
+        Code of the stone to place
+
+    Returns
+    -------
+    tuple
+        Undo record (point, previous_code, code, captured, hash_delta) with the
+        point, the code of the stone it had before the move, the code of the
+        placed stone, the captured points and the change of the hash
+    """
+    if _STATS is not None and (threading.get_ident(),"make_move") not in _MEASURED:
+        return _measure("make_move",_make_move,goban,point,code)
+
+    previous_code = goban["board"][point]
+    previous_hash = goban["hash"]
+    captured = ()
+
+    if previous_code != _NEUTRAL:
+        _remove_stones(goban,(point,))
+
+    if code != _NEUTRAL:
+        captured = tuple(_play(goban,point,code))
+
+    return (point,previous_code,code,captured,previous_hash ^ goban["hash"])
+
+
+def _unmake_move(goban,undo):
+    """
+    Restore a goban to its state before the move of an undo record
+
+    Only the stones of the record and the chains they touch are updated
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move was performed, unchanged since then
+    undo : tuple
+        Undo record of the move
+    """
+    point, previous_code, code, captured, hash_delta = undo
+
+    if code != _NEUTRAL:
+        _remove_stones(goban,(point,))
+
+    # The captured stones belong to the opposing player
+    for captured_point in captured:
+        _add_stone(goban,captured_point,_BLACK + _WHITE - code)
+
+    if previous_code != _NEUTRAL:
+        _add_stone(goban,point,previous_code)
+
+
+def _move_hash(goban,point,code):
+    """
+    Return the hash a goban would have after a move, if the move is not
+    a Suicide, and whether the move captures stones
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move would be performed
+    point : int
+        Free point to occupy with the stone
+    code : int
+        Code of the player's stone to place
+
+    Returns
+    -------
+    tuple or None
+        Pair with the hash of the goban after the move and a bool that is True
+        if the move captures stones, or None if the move is a Suicide
+    """
+    if _STATS is not None:
+        _STATS["checked_moves"] += 1
+
+    board = goban["board"]
+    chains = goban["chains"]
+    records = goban["records"]
+    keys = _ZOBRIST_KEYS[goban["size"]]
+    move_hash = goban["hash"] ^ keys[code][point]
+    unit = _LIBERTY_UNITS[point] >> 9
+    has_liberties = False
+    captured = []
+
+    for adjacent in _NEIGHBOURS[goban["size"]][point]:
+        adjacent_code = board[adjacent]
+
+        if adjacent_code == _NEUTRAL:
+            has_liberties = True
+            continue
+
+        # 'point' is a liberty of every adjacent chain, so the chain is in
+        # atari if it is the only one
+        head = chains[adjacent]
+        liberties = records[head] >> 9
+        in_atari = liberties == (liberties & 0x7FF)*unit
+
+        if adjacent_code == code:
+            has_liberties = has_liberties or not in_atari
+
+        # An opposing chain whose last liberty is 'point' is captured
+        elif in_atari and head not in captured:
+            has_liberties = True
+            captured.append(head)
+            for captured_point in _chain_points(goban,adjacent):
+                move_hash ^= keys[adjacent_code][captured_point]
+
+    if not has_liberties:
+        return None
+
+    return (move_hash,len(captured) > 0)
+
+
+# Kinds of moves
+_OCCUPIED, _PLACEMENT, _CAPTURE, _SUICIDE, _KO = "occupied", "placement", "capture", "suicide", "ko"
+
+
+def _classify_move(goban,point,code,history):
+    """
+    Return the kind of a move, without performing it
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move would be performed
+    point : int
+        Point to occupy with the stone
+    code : int
+        Code of the player's stone to place
+    history : set or None
+        Hashes of every goban that occurred earlier in the game
+
+    Returns
+    -------
+    str
+        "occupied", "suicide" or "ko" if the move is illegal, "capture" if it
+        captures stones and "placement" otherwise
+    """
+    if goban["board"][point] != _NEUTRAL:
+        return _OCCUPIED
+
+    result = _move_hash(goban,point,code)
+    if result is None:
+        return _SUICIDE
+    if history is not None and result[0] in history:
+        return _KO
+    if result[1]:
+        return _CAPTURE
+
+    return _PLACEMENT
+
+
+def _is_eye(goban,point,code):
+    """
+    Check if a free point is an eye of a player
+
+    A point is an eye if all its adjacent points are occupied by the player's
+    stones and the opposing player occupies fewer than two of its diagonally
+    adjacent points, or none of them on the edge of the goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to which the point belongs
+    point : int
+        Free point to check
+    code : int
+        Code of the player's stone
+
+    Returns
+    -------
+    bool
+        True if 'point' is an eye of the player, False otherwise
+    """
+    patterns = goban.get("patterns")
+    if patterns is not None:
+        return _PATTERN_EYES[patterns[point]] == code
+
+    # The field of each point around 'point' in its pattern mirrors the field
+    # of 'point' in the pattern of that point
+    board = goban["board"]
+    pattern = _EMPTY_PATTERNS[goban["size"]][point]
+    for around, shift in _SURROUNDINGS[goban["size"]][point]:
+        pattern |= board[around] << (14 - shift)
+
+    return _PATTERN_EYES[pattern] == code
+
+
+def _benson(goban,code):
+    """
+    Return the pass-alive chains of a player and the regions they control
+
+    Benson's algorithm: the regions of the player are the connected sets of
+    points not occupied by the player's stones, and a region is vital to a
+    chain if all its free points are liberties of the chain. Chains with
+    fewer than two vital regions are removed, then every region adjacent to a
+    removed chain, until nothing else is removed. The remaining chains cannot
+    be captured even if the player always passes
+
+    The regions are made of the chains and free regions labelled by
+    _label_regions, so only their labels are joined, in a single pass over
+    the points that also collects the liberties of the chains
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to analyse
+    code : int
+        Code of the player's stone
+
+    Returns
+    -------
+    tuple
+        Pair with the set of points of the pass-alive chains and the set of
+        points of the regions controlled by them, i.e. the remaining regions
+        vital to one of them, including any opposing stones inside
+    """
+    board = goban["board"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    labels, components = _label_regions(goban)
+
+    def find(label):
+        """Return the label of the region of the player containing a label"""
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    # Join the labelled regions without the player's stones that touch, and
+    # collect the pairs of adjacent chains of the player and other regions,
+    # and of chains of the player and their liberties. Adjacent points with
+    # different labels that are not the player's are in different regions
+    parent = {label: label for label in components if board[label] != code}
+    adjacent_labels = set()
+    adjacent_liberties = set()
+    for point in range(len(board)):
+        label = labels[point]
+        if board[point] == code:
+            for adjacent in neighbours[point]:
+                adjacent_label = labels[adjacent]
+                if adjacent_label != label:
+                    adjacent_labels.add((label,adjacent_label))
+                    if board[adjacent] == _NEUTRAL:
+                        adjacent_liberties.add((label,adjacent))
+        else:
+            for adjacent in neighbours[point]:
+                if adjacent > point and board[adjacent] != code and labels[adjacent] != label:
+                    parent[find(label)] = find(labels[adjacent])
+
+    # Free points and adjacent chains of each region of the player
+    regions = {}
+    for label in parent:
+        region = regions.setdefault(find(label),[[],0,set()])
+        region[0].append(label)
+        if board[label] == _NEUTRAL:
+            region[1] += len(components[label])
+    for chain, label in adjacent_labels:
+        regions[find(label)][2].add(chain)
+
+    # A region is vital to an adjacent chain if all its free points are
+    # liberties of the chain, so count the liberties of each chain by region
+    alive = {label for label in components if board[label] == code}
+    liberties = {chain: {} for chain in alive}
+    for chain, point in adjacent_liberties:
+        counts = liberties[chain]
+        root = find(labels[point])
+        counts[root] = counts.get(root,0) + 1
+    vital = {}
+    for root, (members, free, border) in regions.items():
+        vital[root] = {x for x in border if free and liberties[x].get(root,0) == free}
+
+    healthy = set(regions)
+
+    while True:
+        # Remove the chains with fewer than two vital healthy regions
+        vital_regions = dict.fromkeys(alive,0)
+        for region in healthy:
+            for chain in vital[region]:
+                if chain in vital_regions:
+                    vital_regions[chain] += 1
+        removed = {x for x, count in vital_regions.items() if count < 2}
+        if not removed:
+            break
+        alive -= removed
+
+        # Remove the regions adjacent to a removed chain
+        healthy = {x for x in healthy if not regions[x][2] & removed}
+
+    stones = {point for label in alive for point in components[label]}
+    controlled = {
+        point for region in healthy if vital[region] & alive
+        for label in regions[region][0] for point in components[label]
+    }
+
+    return stones, controlled
+
+
+def _check_goban(goban,round_trips = False):
+    """
+    Check that the chains, records, bitmasks, counts, hash and patterns of a
+    goban agree with its board, for debugging
+
+    The chains are found again by flooding the board and every other field
+    is computed again from them, so a check costs far more than a move. With
+    'round_trips', every move of both players that is not a Suicide is also
+    performed and undone, checking the goban after each and that undoing the
+    move restores it
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to check
+    round_trips : bool, optional
+        Whether to also check the moves performed and undone on the goban
+
+    Raises
+    ------
+    ValueError:
+        If a field of the goban does not agree with its board, or a move or
+        its undoing does not agree with _move_hash or with the goban before
+    """
+    size = goban["size"]
+    board = goban["board"]
+    chains = goban["chains"]
+    neighbours = _NEIGHBOURS[size]
+    keys = _ZOBRIST_KEYS[size]
+
+    # Every chain is the flood of its player's stones from any of them, with
+    # a single head, a circular list of its stones and a record at its head
+    heads = set()
+    for point in range(len(board)):
+        if board[point] == _NEUTRAL:
+            if chains[point] != -1:
+                raise ValueError("_check_goban: cadeias inconsistentes")
+            continue
+        if chains[point] in heads:
+            continue
+
+        stones = {point}
+        pending = [point]
+        while pending:
+            member = pending.pop()
+            for adjacent in neighbours[member]:
+                if board[adjacent] == board[point] and adjacent not in stones:
+                    stones.add(adjacent)
+                    pending.append(adjacent)
+
+        head = chains[point]
+        members = _chain_points(goban,point)
+        if head not in stones or any(chains[x] != head for x in stones) or \
+           len(members) != len(stones) or set(members) != stones:
+            raise ValueError("_check_goban: cadeias inconsistentes")
+
+        record = len(stones) + sum(_LIBERTY_UNITS[adjacent] for member in stones \
+                                   for adjacent in neighbours[member] if board[adjacent] == _NEUTRAL)
+        if goban["records"].get(head) != record:
+            raise ValueError("_check_goban: liberdades inconsistentes")
+        heads.add(head)
+
+    if set(goban["records"]) != heads:
+        raise ValueError("_check_goban: liberdades inconsistentes")
+
+    # Bitmasks, counts and hash of the stones
+    masks = [0,0,0]
+    move_hash = 0
+    for point in range(len(board)):
+        if board[point] != _NEUTRAL:
+            masks[board[point]] |= 1 << point
+            move_hash ^= keys[board[point]][point]
+    if list(goban["stones"]) != masks:
+        raise ValueError("_check_goban: mascaras inconsistentes")
+    if list(goban["counts"]) != [board.count(code) for code in (_NEUTRAL,_BLACK,_WHITE)]:
+        raise ValueError("_check_goban: contagens inconsistentes")
+    if goban["hash"] != move_hash:
+        raise ValueError("_check_goban: hash inconsistente")
+
+    # Patterns, in the gobans that keep them
+    if goban.get("patterns") is not None:
+        patterns = list(_EMPTY_PATTERNS[size])
+        for point in range(len(board)):
+            for around, shift in _SURROUNDINGS[size][point]:
+                patterns[around] ^= board[point] << shift
+        if list(goban["patterns"]) != patterns:
+            raise ValueError("_check_goban: padroes inconsistentes")
+
+    if not round_trips:
+        return
+
+    # Every move that is not a Suicide gives the hash and captures foreseen by
+    # _move_hash, and undoing it restores the stones of the goban
+    before = (bytes(board),goban["hash"],list(goban["stones"]),list(goban["counts"]))
+    for code in (_BLACK,_WHITE):
+        for point in range(len(board)):
+            if board[point] != _NEUTRAL:
+                continue
+            result = _move_hash(goban,point,code)
+            if result is None:
+                continue
+
+            undo = _make_move(goban,point,code)
+            if goban["hash"] != result[0] or bool(undo[3]) != result[1]:
+                raise ValueError("_check_goban: jogada inconsistente")
+            _check_goban(goban)
+
+            _unmake_move(goban,undo)
+            if (bytes(board),goban["hash"],list(goban["stones"]),list(goban["counts"])) != before:
+                raise ValueError("_check_goban: jogada desfeita inconsistente")
+            _check_goban(goban)
+
+
+# Modifiers
+def place_stone(goban,intersection,stone):
+    """
+    Place a stone on a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the stone will be placed
+    intersection : intersection
+        Intersection to occupy with the stone
+    stone : stone
+        Stone to place
+    
+    Returns
+    -------
+    goban
+        Modified goban
+    """
+    point = _point(goban,intersection)
+
+    if goban["board"][point] != _NEUTRAL:
+        _remove_stones(goban,(point,))
+
+    if is_player_stone(stone):
+        _add_stone(goban,point,_CODES[stone])
+
+    return goban
+
+
+def remove_stone(goban,intersection):
+    """
+    Remove a stone from a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which the stone will be removed
+    intersection : intersection
+        Intersection whose stone will be removed
+
+    Returns
+    -------
+    goban
+        Modified goban
+    """
+    place_stone(goban,intersection,create_neutral_stone())
+
+    return goban
+
+
+def remove_chain(goban,intersections_tuple):
+    """
+    Remove stones from intersections of a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which the stones will be removed
+    intersections_tuple : tuple
+        Intersections whose stones will be removed
+
+    Returns
+    -------
+    goban
+        Modified goban
+    """
+    board = goban["board"]
+    points = {_point(goban,x) for x in intersections_tuple}
+
+    _remove_stones(goban,{x for x in points if board[x] != _NEUTRAL})
+    
+    return goban
+
+
+# Recognizers
+def is_goban(arg):
+    """
+    Check if the argument is a goban ADT
+
+    Parameters
+    ----------
+    arg : universal
+        Parameter to check
 
     Returns
     -------
@@ -825,361 +2165,1275 @@ def gobans_equal(goban1,goban2):
         True if valid, False otherwise
     """
     if (
-        not is_goban(goban1) or 
-        not is_goban(goban2) or
-        len(goban1) != len(goban2)
+        not isinstance(arg,dict) or
+        not isinstance(arg.get("size"),int) or
+        (arg["size"] != 9 and arg["size"] != 13 and arg["size"] != 19)
+    ):
+        return False
+    
+    size = arg["size"]
+    board = arg.get("board")
+    chains = arg.get("chains")
+
+    if (
+        not isinstance(board,bytearray) or
+        len(board) != size*size or
+        any(code > _WHITE for code in board) or
+        not isinstance(chains,array.array) or
+        len(chains) != size*size or
+        not isinstance(arg.get("records"),dict) or
+        not isinstance(arg.get("hash"),int)
     ):
         return False
     
-    size = len(goban1)
+    return True
+
+
+def is_valid_intersection(goban,intersection):
+    """
+    Check if an intersection is valid within a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to consider
+    intersection : intersection
+        Intersection to check
+        
+    Returns
+    -------
+    bool
+        True if valid, False otherwise
+    """
+    if (
+        not get_col(intersection) <= get_col(get_last_intersection(goban)) or
+        not get_row(intersection) <= get_row(get_last_intersection(goban))
+    ):
+        return False
+    
+    return True
+
+
+# Test
+def gobans_equal(goban1,goban2):
+    """
+    Check if the arguments are gobans and are equal
+
+    Parameters
+    ----------
+    goban1 : universal
+        First parameter to check
+    goban2 : universal
+        Second parameter to check
+
+    Returns
+    -------
+    bool
+        True if valid, False otherwise
+    """
+    if _STATS is not None and (threading.get_ident(),"gobans_equal") not in _MEASURED:
+        return _measure("gobans_equal",gobans_equal,goban1,goban2)
+
+    if (
+        not is_goban(goban1) or 
+        not is_goban(goban2) or
+        goban1["size"] != goban2["size"] or
+        get_hash(goban1) != get_hash(goban2)
+    ):
+        return False
+    
+    # Check if the gobans have equal stones
+    return goban1["board"] == goban2["board"]
+
+
+# Transformers
+def goban_to_str(goban):
+    """
+    Return the string representation of a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to represent
+
+    Returns
+    -------
+    str
+        External representation of 'goban'
+    """
+    if _STATS is not None and (threading.get_ident(),"goban_to_str") not in _MEASURED:
+        return _measure("goban_to_str",goban_to_str,goban)
+
+    lines = ""
+    size = goban["size"]
+    board = goban["board"]
+
+    # Write the central rows (with intersections)
+    for row in range(size,0,-1):
+        # Create a 'line' with a sequence of 'O', 'X' and '.' according to the stones
+        # occupying the intersections of the 'row' of the goban
+        line = ""
+        for point in range((row - 1)*size,row*size):
+            line += " " + stone_to_str(_STONES[board[point]])
+
+        # Format the 'line' and add it to 'lines'
+        line = "{:>2}{} {:>2}".format(row,line,row)
+        lines += '\n' + line
+
+    # Write the first and last row, i.e. create a 'line' with the
+    # sequence of letters corresponding to the goban's columns
+    line = ""
+    for i in range(size):
+        line += " " + chr(ord('A') + i)
+
+    # Format the 'line' and add it to 'lines'
+    line = "  {}".format(line)
+    lines = line + lines + '\n' + line
+
+    return lines
+
+
+# Codes of the four points packed in each byte, from the lowest bits
+_UNPACKED_BYTES = tuple(bytes((byte >> shift) & 3 for shift in (0,2,4,6)) for byte in range(256))
+
+
+def pack_goban(goban):
+    """
+    Return the packed representation of a goban
+
+    The stones are packed at 2 bits per point, four points per byte from the
+    lowest bits and in reading order, so an n x n goban takes (n*n + 3)//4
+    bytes, e.g. 91 bytes for 19x19
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to represent
+
+    Returns
+    -------
+    bytes
+        Packed representation of 'goban'
+    """
+    board = goban["board"] + bytes(-len(goban["board"]) % 4)
+
+    return bytes(a | b << 2 | c << 4 | d << 6 for a, b, c, d in \
+                 zip(board[0::4],board[1::4],board[2::4],board[3::4]))
+
+
+def unpack_goban(packed):
+    """
+    Return the goban of a packed representation
+
+    Parameters
+    ----------
+    packed : bytes-like
+        Packed representation returned by pack_goban, whose length
+        determines the dimension of the goban
+
+    Returns
+    -------
+    goban
+        Goban equal to the packed one
+
+    Raises
+    ------
+    ValueError:
+        If 'packed' is not the packed representation of a 9x9, 13x13, or
+        19x19 goban
+    """
+    n = {(x*x + 3)//4: x for x in (9,13,19)}.get(len(packed))
+    if n is None:
+        raise ValueError("unpack_goban: argumento invalido")
+
+    board = b"".join(_UNPACKED_BYTES[x] for x in packed)
+    if any(board[n*n:]) or 3 in board:
+        raise ValueError("unpack_goban: argumento invalido")
+
+    goban = create_empty_goban(n)
+    for point in range(n*n):
+        if board[point] != _NEUTRAL:
+            _add_stone(goban,point,board[point])
+
+    return goban
+
+
+def transform_goban(goban,transform):
+    """
+    Return the goban a goban is taken to by a symmetry
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to transform, which is not modified
+    transform : int
+        Symmetry from 0 to 7, as in transform_intersection
+
+    Returns
+    -------
+    goban
+        Transformed copy of 'goban'
+
+    Raises
+    ------
+    ValueError:
+        If 'transform' is not an integer from 0 to 7
+    """
+    if not isinstance(transform,int) or not 0 <= transform <= 7:
+        raise ValueError("transform_goban: argumentos invalidos")
+
+    size = goban["size"]
+    points = _TRANSFORMS[size][transform]
+    transformed = create_empty_goban(size)
+
+    # Move every stone, which rebuilds the chains on the transformed goban
+    for point, code in enumerate(goban["board"]):
+        if code != _NEUTRAL:
+            _add_stone(transformed,points[point],code)
+
+    return transformed
+
+
+def _symmetric_hashes(goban):
+    """
+    Return the hash of the goban each symmetry takes a goban to
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose symmetric hashes are computed
+
+    Returns
+    -------
+    list
+        Hash of the transformed goban of each symmetry, from 0 to 7
+    """
+    keys = _ZOBRIST_KEYS[goban["size"]]
+    stones = goban["stones"]
+    hashes = 8*[0]
+
+    for code in (_BLACK,_WHITE):
+        occupied = _mask_points(stones[code])
+        for transform, points in enumerate(_TRANSFORMS[goban["size"]]):
+            for point in occupied:
+                hashes[transform] ^= keys[code][points[point]]
+
+    return hashes
+
+
+def canonical_goban(goban):
+    """
+    Return the canonical goban of a goban and the symmetry that leads to it
+
+    The canonical goban is the symmetric goban with the smallest hash, so
+    all 8 symmetric gobans of a goban have the same canonical goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose canonical goban is obtained, which is not modified
+
+    Returns
+    -------
+    tuple
+        Pair with the canonical goban and the symmetry, from 0 to 7, that
+        takes 'goban' to it, which can be given to transform_intersection
+        to take moves to the canonical goban and back
+    """
+    hashes = _symmetric_hashes(goban)
+    transform = hashes.index(min(hashes))
+
+    return transform_goban(goban,transform), transform
+
+
+def get_canonical_hash(goban):
+    """
+    Return the hash of the canonical goban of a goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose canonical hash is obtained
+
+    Returns
+    -------
+    int
+        Smallest hash of the 8 symmetric gobans of 'goban', the same for all
+        of them
+    """
+    return min(_symmetric_hashes(goban))
+
+
+# High-Level Functions
+def get_intersections(goban,stone):
+    """
+    Return all intersections of a goban occupied by a given stone
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose intersections will be retrieved
+    stone : stone
+        Stone occupying the intersections to be retrieved
+
+    Returns
+    -------
+    tuple
+        Retrieved intersections
+    """
+    if not is_stone(stone):
+        return ()
+
+    size = goban["size"]
+    stones = goban["stones"]
+    code = _CODES[stone]
+
+    # The free points are those occupied by neither player
+    mask = stones[code] if code != _NEUTRAL else ~(stones[_BLACK] | stones[_WHITE]) & ((1 << size*size) - 1)
+
+    # Sort the points occupied by 'stone' column by column
+    return tuple(_intersection(goban,x) for x in \
+                 sorted(_mask_points(mask),key = lambda x: (x % size,x // size)))
+
+
+def get_territories(goban):
+    """
+    Return the territories of a goban
+
+    The territories will be returned with their intersections in reading order
+    and sorted among themselves according to their first intersection by the same order
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose territories will be retrieved
+
+    Returns
+    -------
+    tuple
+        Tuple of tuples with the intersections of each territory of the goban
+    """
+    board = goban["board"]
+    labels, regions = _label_regions(goban)
+
+    # The regions are indexed by their first point in reading order
+    return tuple(tuple(_intersection(goban,x) for x in region) \
+                 for label, region in regions.items() if board[label] == _NEUTRAL)
+
+
+def get_pass_alive(goban,stone):
+    """
+    Return the pass-alive chains of a player and the regions they control
+
+    A chain is pass-alive if it cannot be captured even if its player always
+    passes, as found by Benson's algorithm. The regions it controls are
+    points of the player's score however the game goes on
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to analyse
+    stone : stone
+        Player's stone
+
+    Returns
+    -------
+    tuple
+        Pair of tuples with the intersections of the pass-alive chains and of
+        the controlled regions, including any opposing stones inside them,
+        each in reading order, or a pair of empty tuples if 'stone' is not a
+        player's stone
+    """
+    if not is_player_stone(stone):
+        return (),()
+
+    stones, regions = _benson(goban,_CODES[stone])
+
+    return tuple(_intersection(goban,x) for x in sorted(stones)), \
+           tuple(_intersection(goban,x) for x in sorted(regions))
+
+
+def get_different_adjacents(goban,intersections): 
+    """
+    Return the adjacent intersections to intersections. These will be:
+    -> occupied by stones, if the latter are free
+    -> free, if the latter belong to a player
+
+    Parameters
+    ----------
+    goban : goban
+        Goban to which the intersections belong
+    intersections : tuple
+        Intersections whose different adjacent intersections will be retrieved
+
+    Returns
+    -------
+    tuple
+        Different adjacent intersections retrieved in reading order
+    """
+    if _STATS is not None and (threading.get_ident(),"get_different_adjacents") not in _MEASURED:
+        return _measure("get_different_adjacents",get_different_adjacents,goban,intersections)
+
+    board = goban["board"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    points = tuple(_point(goban,x) for x in intersections)
+    occupation_state = board[points[0]] != _NEUTRAL
+    adjacents = set()
+
+    # Get the points adjacent to 'intersections' with a different occupation state
+    for point in points:
+        for adjacent in neighbours[point]:
+            if occupation_state != (board[adjacent] != _NEUTRAL):
+                adjacents.add(adjacent)
+    
+    return tuple(_intersection(goban,x) for x in sorted(adjacents))
+
+
+def make_move(goban,intersection,stone,undo = False): 
+    """
+    Place a player's stone on an intersection of a goban, remove the opposing
+    player's stones belonging to adjacent chains that have no liberties,
+    and return the modified goban
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the stone will be placed
+    intersection : intersection
+        Intersection to occupy with the stone
+    stone : stone
+        Stone to place
+    undo : bool, optional
+        If True, return the undo record of the move instead of the goban
+    
+    Returns
+    -------
+    goban or tuple
+        Modified goban or, if 'undo' is True, the undo record of the move,
+        which lists the occupied point, the captured points and the change
+        of the hash of the goban and can be given to unmake_move
+    """
+    # Place the stone and remove the opposing chains left without liberties
+    record = _make_move(goban,_point(goban,intersection),_CODES[stone])
+
+    if undo:
+        return record
+
+    return goban
+
+
+def unmake_move(goban,undo):
+    """
+    Undo a move performed by make_move and return the restored goban
+
+    The goban is restored in time proportional to the stones the move
+    placed and captured, instead of keeping a copy of it
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move was performed, unchanged since then
+    undo : tuple
+        Undo record returned by make_move
+
+    Returns
+    -------
+    goban
+        Goban as it was before the move
+    """
+    _unmake_move(goban,undo)
+
+    return goban
+
+
+def get_player_stones(goban):
+    """
+    Return the number of intersections occupied by each player's stones
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose intersections will be counted
+    
+    Returns
+    -------
+    tuple
+        Tuple of two integers corresponding to the number of intersections
+        occupied by the white and black player's stones, respectively
+    """
+    counts = goban["counts"]
+
+    return (counts[_WHITE],counts[_BLACK])
+
+
+# Additional Functions
+def calculate_scores(goban):
+    """
+    Return each player's score
+
+    Each player's score is obtained by:
+    -> the number of intersections occupied by that player's stones
+    -> the number of intersections forming territories whose border consists
+    only of that player's stones
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which the scores will be retrieved
+    
+    Returns
+    -------
+    tuple
+        Tuple of two integers corresponding to the scores of the white
+        and black player, respectively
+    """
+    if _STATS is not None and (threading.get_ident(),"calculate_scores") not in _MEASURED:
+        return _measure("calculate_scores",calculate_scores,goban)
+
+    # Get the number of intersections occupied by each player's stones
+    white_score, black_score = get_player_stones(goban)
+
+    board = goban["board"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    labels, regions = _label_regions(goban)
+
+    # Iterate over the territories of the 'goban', i.e. its free regions
+    for label, territory in regions.items():
+        if board[label] != _NEUTRAL:
+            continue
+
+        # Get the stones of the 'border' of the 'territory'
+        border = {board[adjacent] for point in territory for adjacent in neighbours[point]}
+        border.discard(_NEUTRAL)
+        if len(border) == 0:
+            break
+        
+        # If the 'border' consists only of white stones,
+        # include the territory in the white player's score
+        if border == {_WHITE}:
+            white_score += len(territory)
+
+        # If the 'border' consists only of black stones,
+        # include the territory in the black player's score
+        elif border == {_BLACK}:
+            black_score += len(territory)
+
+    return (white_score,black_score)
+
+
+def calculate_settled_scores(goban):
+    """
+    Return the points of each player's score that can no longer change
+
+    These are the points of the player's pass-alive chains and of the
+    regions they control, as found by Benson's algorithm. Both calls share
+    the labelling of the regions of the goban. If the scores add up to the
+    number of intersections, the goban is settled and they are the final
+    scores however the game goes on
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which the scores will be retrieved
+
+    Returns
+    -------
+    tuple
+        Tuple of two integers corresponding to the settled scores of the
+        white and black player, respectively
+    """
+    white_stones, white_regions = _benson(goban,_WHITE)
+    black_stones, black_regions = _benson(goban,_BLACK)
+
+    return (len(white_stones) + len(white_regions),len(black_stones) + len(black_regions))
+
+
+def create_score_tracker(goban):
+    """
+    Return a score tracker of a goban
+
+    The tracker keeps the free regions of the goban and the player, if any,
+    whose stones are their whole border, and updates them from the points
+    whose stones changed since it was last updated, so the scores are
+    obtained in time proportional to the regions touched by the last moves
+    instead of the whole goban. The tracker follows every modification of
+    the goban, by make_move, unmake_move, place_stone or remove_stone
+
+    Parameters
+    ----------
+    goban : goban
+        Goban whose scores are tracked
+
+    Returns
+    -------
+    dict
+        Tracker with the goban ("goban"), the board of its last update
+        ("board"), the region of each free point ("region_of"), the points
+        and owner (code of the stones of the border, or the neutral code) of
+        each region ("regions"), the next region number ("next") and the
+        number of intersections in each owner's territories ("territories")
+    """
+    tracker = {
+        "goban": goban,
+        "board": bytes(len(goban["board"])),
+        "region_of": len(goban["board"])*[None],
+        "regions": {},
+        "next": 0,
+        "territories": [0,0,0]
+    }
+    _update_regions(tracker,range(len(goban["board"])))
+    tracker["board"] = bytes(goban["board"])
+
+    return tracker
+
+
+def _update_regions(tracker,changed):
+    """
+    Relabel the free regions of a tracker touched by some points
+
+    Parameters
+    ----------
+    tracker : dict
+        Score tracker to update
+    changed : iterable
+        Points whose stones changed since the regions were last labelled
+    """
+    goban = tracker["goban"]
+    board = goban["board"]
+    neighbours = _NEIGHBOURS[goban["size"]]
+    region_of = tracker["region_of"]
+    regions = tracker["regions"]
+
+    # Remove the regions that contain or are adjacent to a changed point, and
+    # collect their points that are still free with the freed points
+    candidates = set()
+    for point in changed:
+        for touched in (point,) + neighbours[point]:
+            region = region_of[touched]
+            if region is not None:
+                points, owner = regions.pop(region)
+                tracker["territories"][owner] -= len(points)
+                for member in points:
+                    region_of[member] = None
+                candidates.update(points)
+        candidates.add(point)
+
+    candidates = {x for x in candidates if board[x] == _NEUTRAL}
+
+    # Label the free regions of the candidates and find their owners
+    while candidates:
+        region = tracker["next"]
+        tracker["next"] += 1
+        start = candidates.pop()
+        points = {start}
+        pending = [start]
+        border = set()
+        region_of[start] = region
+
+        while pending:
+            point = pending.pop()
+            for adjacent in neighbours[point]:
+                if board[adjacent] != _NEUTRAL:
+                    border.add(board[adjacent])
+                elif adjacent in candidates:
+                    candidates.discard(adjacent)
+                    points.add(adjacent)
+                    region_of[adjacent] = region
+                    pending.append(adjacent)
+
+        owner = border.pop() if len(border) == 1 else _NEUTRAL
+        regions[region] = (points,owner)
+        tracker["territories"][owner] += len(points)
+
+
+def get_tracked_scores(tracker):
+    """
+    Return each player's score, updating a score tracker
+
+    Parameters
+    ----------
+    tracker : dict
+        Score tracker of the goban
+
+    Returns
+    -------
+    tuple
+        Tuple of two integers corresponding to the scores of the white
+        and black player, respectively, equal to those of calculate_scores
+    """
+    if _STATS is not None and (threading.get_ident(),"get_tracked_scores") not in _MEASURED:
+        return _measure("get_tracked_scores",get_tracked_scores,tracker)
+
+    goban = tracker["goban"]
+    board = bytes(goban["board"])
+
+    # Find the points whose stones changed, comparing both boards at once
+    difference = int.from_bytes(board,"little") ^ int.from_bytes(tracker["board"],"little")
+    if difference:
+        changed = []
+        while difference:
+            point = ((difference & -difference).bit_length() - 1) >> 3
+            changed.append(point)
+            difference &= ~(0xFF << 8*point)
+
+        _update_regions(tracker,changed)
+        tracker["board"] = board
+
+    counts = goban["counts"]
+    territories = tracker["territories"]
+
+    return (counts[_WHITE] + territories[_WHITE],counts[_BLACK] + territories[_BLACK])
+
+
+def is_legal_move(goban,intersection,stone,previous_goban,history = None):
+    """
+    Check if a move on a goban is legal
+
+    The move is checked without modifying or copying the goban: its hash is
+    obtained from the hash of 'goban' and the keys of the stones it places
+    and captures
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move would be performed
+    intersection : intersection
+        Intersection where the stone will be placed
+    stone : stone
+        Stone to be placed
+    previous_goban : goban or None
+        Goban obtained at the end of the player's last turn, if known
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
+
+    Returns
+    -------
+    bool
+        True if legal, False otherwise
+    """
+    if _STATS is not None and (threading.get_ident(),"is_legal_move") not in _MEASURED:
+        stats = _STATS
+        reason = _measure("is_legal_move",_rejection_reason,goban,intersection,stone,previous_goban,history)
+        if reason is not None:
+            stats["rejections"][reason] += 1
+
+        return reason is None
+
+    return _rejection_reason(goban,intersection,stone,previous_goban,history) is None
+
+
+def _rejection_reason(goban,intersection,stone,previous_goban,history):
+    """
+    Return why a move on a goban is illegal, as checked by is_legal_move
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the move would be performed
+    intersection : intersection
+        Intersection where the stone will be placed
+    stone : stone
+        Stone to be placed
+    previous_goban : goban or None
+        Goban obtained at the end of the player's last turn, if known
+    history : set or None
+        Hashes of every goban that occurred earlier in the game
 
-    # Check if the gobans have equal stones
-    for column in range(size):
-        for stone in range(size):
-            if not stones_equal(goban1[column][stone],goban2[column][stone]):
-                return False
-            
-    return True
+    Returns
+    -------
+    str or None
+        "occupied", "suicide", "ko" if the move repeats a goban of the
+        history or "repetition" if it repeats 'previous_goban', or None if
+        the move is legal
+    """
+    point = _point(goban,intersection)
+    if goban["board"][point] != _NEUTRAL:
+        return _OCCUPIED
+
+    # Check if the move results in Suicide
+    result = _move_hash(goban,point,_CODES[stone])
+    if result is None:
+        return _SUICIDE
+    move_hash = result[0]
+
+    # Check if the move results in Repetition (Ko) of an earlier goban
+    if history is not None and move_hash in history:
+        return _KO
+
+    # Equal hashes are confirmed against 'previous_goban' stone by stone,
+    # performing the move and undoing it afterwards
+    if isinstance(previous_goban,dict) and previous_goban.get("hash") == move_hash:
+        undo = _make_move(goban,point,_CODES[stone])
+        repeated = gobans_equal(goban,previous_goban)
+        _unmake_move(goban,undo)
+
+        if repeated:
+            return "repetition"
+    
+    return None
 
 
-# Transformer
-def goban_to_str(goban):
+def classify_move(goban,intersection,stone,history = None):
     """
-    Return the string representation of a goban
+    Return the kind of a move on a goban, without performing it
 
     Parameters
     ----------
     goban : goban
-        Goban to represent
+        Goban where the move would be performed
+    intersection : intersection
+        Intersection where the stone would be placed
+    stone : stone
+        Player's stone to be placed
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
 
     Returns
     -------
     str
-        External representation of 'goban'
+        "occupied" if 'intersection' is occupied, "suicide" if the move is
+        a Suicide, "ko" if it repeats a goban of 'history', "capture" if it
+        captures stones and "placement" otherwise
     """
-    lines = ""
-
-    # Write the central rows (with intersections)
-    for row in range(-1,-len(goban) - 1,-1):
-        # Create a 'line' with a sequence of 'O', 'X' and '.' according to the stones
-        # occupying the intersections of the 'row' of the goban
-        line = ""
-        for column in goban:
-            line += " " + stone_to_str(column[row])
-
-        l = str(len(goban) + 1 + row)    # Number corresponding to 'row'
-
-        # Format the 'line' and add it to 'lines'
-        line = "{:>2}{} {:>2}".format(l,line,l)
-        lines += '\n' + line
-
-    # Write the first and last row, i.e. create a 'line' with the
-    # sequence of letters corresponding to the goban's columns
-    line = ""
-    for i in range(len(goban)):
-        line += " " + chr(ord('A') + i)
-
-    # Format the 'line' and add it to 'lines'
-    line = "  {}".format(line)
-    lines = line + lines + '\n' + line
-
-    return lines
+    return _classify_move(goban,_point(goban,intersection),_CODES[stone],history)
 
 
-# High-Level Functions
-def get_intersections(goban,stone):
+def get_legal_moves(goban,stone,history = None,bitmask = False):
     """
-    Return all intersections of a goban occupied by a given stone
+    Return all the legal moves of a player on a goban
+
+    Every free intersection is classified in a single pass over the goban,
+    using the liberties its chains already keep, without copying it
 
     Parameters
     ----------
     goban : goban
-        Goban whose intersections will be retrieved
+        Goban where the moves would be performed
     stone : stone
-        Stone occupying the intersections to be retrieved
+        Player's stone to be placed
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
+    bitmask : bool, optional
+        If True, return the moves as a bitmask instead of a tuple
 
     Returns
     -------
-    tuple
-        Retrieved intersections
+    tuple or int
+        Intersections of the legal moves in reading order or, if 'bitmask'
+        is True, an integer whose bit (r - 1)*n + c is set if the
+        intersection at column c (from 0) and row r is a legal move
     """
-    intersections = ()
-    size = get_row(get_last_intersection(goban))
+    board = goban["board"]
+    code = _CODES[stone]
+    points = [point for point in range(len(board)) if board[point] == _NEUTRAL and \
+              _classify_move(goban,point,code,history) in (_PLACEMENT,_CAPTURE)]
 
-    # Iterate over the goban's intersections
-    for column in range(1,size + 1):
-        for row in range(1,size + 1):
-            intersection = create_intersection(chr(ord("A") + column - 1),row)
+    if bitmask:
+        return sum(1 << point for point in points)
 
-            # Add 'intersection' to 'intersections' if it is occupied by 'stone'
-            if stones_equal(get_stone(goban,intersection),stone):
-                intersections += (intersection,)
+    return tuple(_intersection(goban,point) for point in points)
 
-    return intersections
 
-
-def get_territories(goban):
+def _local_move(goban,last,code,history,rng):
     """
-    Return the territories of a goban
+    Return a move of the playout policy answering the last move, if any
 
-    The territories will be returned with their intersections in reading order
-    and sorted among themselves according to their first intersection by the same order
+    The player first captures the chain of the last move if it is in atari,
+    then saves a chain of their own that the last move put in atari by
+    extending it, and otherwise plays a point around the last move whose 3x3
+    square matches a shape of _PATTERN_SHAPES, chosen with probability
+    proportional to the weight of the shape. Every decision on shapes and
+    eyes reads the patterns of the goban
 
     Parameters
     ----------
     goban : goban
-        Goban whose territories will be retrieved
+        Goban where the move would be performed
+    last : int
+        Point of the opposing player's last move
+    code : int
+        Code of the player's stone
+    history : set
+        Hashes of every goban that occurred earlier
+    rng : random.Random
+        Generator of the choice among the matching points
+
+    Returns
+    -------
+    int or None
+        Free point of a legal move that does not fill one of the player's
+        eyes, or None if the policy has no answer
+    """
+    board = goban["board"]
+    chains = goban["chains"]
+    records = goban["records"]
+    patterns = goban.get("patterns")
+
+    # Points in atari: the liberty of the last move's chain and of the
+    # player's chains next to it, a chain in atari having at most 4
+    # pseudo-liberties, one for each stone next to its liberty
+    candidates = []
+    for adjacent in [last] + [x for x in _NEIGHBOURS[goban["size"]][last] if board[x] == code]:
+        liberties = records[chains[adjacent]] >> 9
+        count = liberties & 0x7FF
+        if count <= 4:
+            liberty = (liberties >> 11 & 0x7FFFF) // count
+            if liberties == count*(_LIBERTY_UNITS[liberty] >> 9):
+                candidates.append(liberty)
+
+    # Otherwise, a point around the last move drawn by the weights of its shape
+    if not candidates:
+        weights = [(x,_PATTERN_WEIGHTS[patterns[x]]) for x, _ in _SURROUNDINGS[goban["size"]][last] \
+                   if board[x] == _NEUTRAL]
+        draw = rng.random()*sum(weight for _, weight in weights)
+        for point, weight in weights:
+            draw -= weight
+            if weight > 0 and draw < 0:
+                candidates.append(point)
+                break
+
+    for point in candidates:
+        if _PATTERN_EYES[patterns[point]] != code:
+            result = _move_hash(goban,point,code)
+            if result is not None and result[0] not in history:
+                return point
+
+    return None
+
+
+def playout(goban,to_move,rng,history = None,patterns = False,stop_settled = False):
+    """
+    Play random moves on a copy of a goban until both players pass and
+    return each player's score
+
+    Each player plays a uniformly random legal move that does not fill one of
+    their own eyes, and passes when there is none. The playout works on the
+    points of the goban, keeping the free points in a list, and stops after
+    3 x n x n turns if the players have not passed by then. With 'patterns',
+    each player first answers the opposing player's last move with the local
+    policy of _local_move and only plays a random move when it has no answer.
+    With 'stop_settled', it also stops when a player passes if the goban is
+    settled, as found by calculate_settled_scores, checking at most once
+    every n turns. Random moves settle the goban only shortly before both
+    players pass, so the check costs about as much as it saves on random
+    playouts and pays off with slower policies
+
+    Parameters
+    ----------
+    goban : goban
+        Goban from which the playout starts, which is not modified
+    to_move : stone
+        Stone of the player who moves first
+    rng : random.Random
+        Generator of the random moves
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
+    patterns : bool, optional
+        Whether to answer the last move with captures, escapes from atari and
+        the shapes of _PATTERN_SHAPES before playing random moves
+    stop_settled : bool, optional
+        Whether to stop once the goban is settled
 
     Returns
     -------
     tuple
-        Tuple of tuples with the intersections of each territory of the goban
-    """
-    discovered_intersections = ()
-    territories = ()
+        Tuple of two integers corresponding to the scores of the white
+        and black player, respectively, at the end of the playout
+    """
+    goban = _scratch_goban(goban)
+    board = goban["board"]
+    shapes = goban["patterns"]
+    history = set() if history is None else set(history)
+    history.add(goban["hash"])
+
+    # Free points, and the position of each of them in 'free_points'
+    free_points = [point for point in range(len(board)) if board[point] == _NEUTRAL]
+    positions = len(board)*[0]
+    for i, point in enumerate(free_points):
+        positions[point] = i
+
+    code = _CODES[to_move]
+    last = None
+    passes = 0
+    turns = 0
+    checked = -goban["size"]
+    while passes < 2 and turns < 3*len(board):
+        point = None
+        if patterns and last is not None:
+            point = _local_move(goban,last,code,history,rng)
+
+        # Otherwise, try the free points in random order, moving the rejected
+        # ones to the end of the list
+        candidates = len(free_points) if point is None else 1
+        while point is None and candidates > 0:
+            i = int(rng.random()*candidates)
+            point = free_points[i]
+
+            if _PATTERN_EYES[shapes[point]] != code:
+                result = _move_hash(goban,point,code)
+                if result is not None and result[0] not in history:
+                    break
+
+            candidates -= 1
+            other = free_points[candidates]
+            free_points[i], free_points[candidates] = other, point
+            positions[other], positions[point] = i, candidates
+            point = None
+
+        if candidates > 0:
+            # Remove 'point' from the free points and add the captured ones
+            other = free_points[-1]
+            free_points[positions[point]] = other
+            positions[other] = positions[point]
+            free_points.pop()
+
+            for captured_point in _play(goban,point,code):
+                positions[captured_point] = len(free_points)
+                free_points.append(captured_point)
+
+            history.add(goban["hash"])
+            passes = 0
+        else:
+            passes += 1
 
-    # Iterate over the goban's intersections occupied by neutral stones
-    for intersection in get_intersections(goban,create_neutral_stone()):
+        last = point
+        code = _BLACK + _WHITE - code
+        turns += 1
 
-        # If the intersection has not been discovered, get its chain, i.e.
-        # the 'territory' it belongs to
-        if intersection not in discovered_intersections:
-            territory = sort_intersections(get_chain(goban,intersection))
-            territories += (territory,)
+        if stop_settled and passes == 1 and turns - checked >= goban["size"]:
+            checked = turns
+            scores = calculate_settled_scores(goban)
+            if sum(scores) == len(board):
+                return scores
 
-            # Add the intersections of 'territory' to 'discovered_intersections'
-            discovered_intersections += territory
-    
-    # Sort 'territories' by their first intersection in reading order
-    return tuple(sorted(territories, key = lambda x: (get_row(x[0]),get_col(x[0]))))
+    return calculate_scores(goban)
 
 
-def get_different_adjacents(goban,intersections): 
+def _ask_intersection(goban,stone,previous_goban,history):
     """
-    Return the adjacent intersections to intersections. These will be:
-    -> occupied by stones, if the latter are free
-    -> free, if the latter belong to a player
+    Ask the player at the terminal for an intersection of a legal move
 
     Parameters
     ----------
     goban : goban
-        Goban to which the intersections belong
-    intersections : tuple
-        Intersections whose different adjacent intersections will be retrieved
+        Goban where the game is played
+    stone : stone
+        Player's stone
+    previous_goban : goban or None
+        Goban obtained at the end of the player's last turn, if known
+    history : set or None
+        Hashes of every goban that occurred earlier in the game
 
     Returns
     -------
-    tuple
-        Different adjacent intersections retrieved in reading order
+    intersection or None
+        Intersection chosen by the player, or None if the player passed
     """
-    adjacents = ()
-    occupation_state = is_player_stone(get_stone(goban,intersections[0]))
-
-    # Get the intersections adjacent to 'intersections'
-    for intersection in intersections:
-        for adjacent in get_adjacent_intersections(intersection,get_last_intersection(goban)):
-
-            # If 'adjacent' is different from 'intersections' and is not already
-            # in 'adjacents', add it
-            if (
-                occupation_state != is_player_stone(get_stone(goban,adjacent)) and
-                adjacent not in adjacents
-            ):
-                adjacents += (adjacent,)
-    
-    return sort_intersections(adjacents)
+    # Check the validity of the player's choice
+    choice = ""
+    while (
+        not len(choice) >= 2 or
+        not choice[0].isalpha() or
+        not "A" <= choice[0] <= "S" or
+        not choice[1:].isnumeric() or
+        not 1 <= int(choice[1:]) <= 19 or
+        not is_valid_intersection(goban,str_to_intersection(choice)) or
+        not is_legal_move(goban,str_to_intersection(choice),stone,previous_goban,history)
+    ):
+        # Check if the player passed their turn
+        if choice == "P":
+            return None
+            
+        choice = input("Escreva uma intersection ou 'P' para passar ["+stone_to_str(stone)+"]:")
 
+    return str_to_intersection(choice)
 
-def make_move(goban,intersection,stone): 
+
+def player_turn(goban,stone,previous_goban,history = None):
     """
-    Place a player's stone on an intersection of a goban, remove the opposing
-    player's stones belonging to adjacent chains that have no liberties,
-    and return the modified goban
+    Offer a player the option to pass or place their stone on an intersection
+    and return whether the player passed
 
     Parameters
     ----------
     goban : goban
-        Goban where the stone will be placed
-    intersection : intersection
-        Intersection to occupy with the stone
+        Goban where the game is played
     stone : stone
-        Stone to place
-    
+        Player's stone
+    previous_goban : goban or None
+        Goban obtained at the end of the player's last turn, if known
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
+
     Returns
     -------
-    goban
-        Modified goban
+    bool
+        True if the player did not pass, False otherwise
     """
-    place_stone(goban,intersection,stone)
-
-    removed_chains = ()
-
-    # Iterate over the intersections adjacent to 'intersection'
-    adjacents = get_adjacent_intersections(intersection,get_last_intersection(goban))
-    for adjacent in adjacents:
-
-        # If the stone occupying 'adjacent' belongs to a player and is different
-        # from 'stone', get the chain of 'adjacent'
-        adjacent_stone = get_stone(goban,adjacent)
-        if (
-            is_player_stone(adjacent_stone) and
-            is_white_stone(stone) != is_white_stone(adjacent_stone)
-        ):
-            chain = get_chain(goban,adjacent)
+    intersection = _ask_intersection(goban,stone,previous_goban,history)
+    if intersection is None:
+        return False
 
-            # If 'chain' has not been removed and has no liberties,
-            # remove the chain and add it to 'removed_chains'
-            if chain not in removed_chains and len(get_different_adjacents(goban,chain)) == 0:
-                remove_chain(goban,chain)
-                removed_chains += (chain,)
+    make_move(goban,intersection,stone)
 
-    return goban
+    return True
 
 
-def get_player_stones(goban):
+# Players
+# A player is a function that receives the goban, the player's stone and the
+# hashes of the earlier gobans, and returns the intersection of a legal move
+# or None to pass
+def terminal_player(goban,stone,history):
     """
-    Return the number of intersections occupied by each player's stones
+    Return the move the player at the terminal chooses, or None to pass
 
     Parameters
     ----------
     goban : goban
-        Goban whose intersections will be counted
-    
+        Goban where the game is played
+    stone : stone
+        Player's stone
+    history : set
+        Hashes of every goban that occurred earlier in the game
+
     Returns
     -------
-    tuple
-        Tuple of two integers corresponding to the number of intersections
-        occupied by the white and black player's stones, respectively
+    intersection or None
+        Intersection of a legal move, or None to pass
     """
-    return (len(get_intersections(goban,create_white_stone())), \
-            len(get_intersections(goban,create_black_stone())))
+    return _ask_intersection(goban,stone,None,history)
 
 
-# Additional Functions
-def calculate_scores(goban):
+def create_scripted_player(moves):
     """
-    Return each player's score
-
-    Each player's score is obtained by:
-    -> the number of intersections occupied by that player's stones
-    -> the number of intersections forming territories whose border consists
-    only of that player's stones
+    Return a player that performs a list of moves in order
 
     Parameters
     ----------
-    goban : goban
-        Goban from which the scores will be retrieved
-    
+    moves : iterable
+        External representations of the intersections of the moves, where
+        "P" or None is a pass. The player passes after the last move
+
     Returns
     -------
-    tuple
-        Tuple of two integers corresponding to the scores of the white
-        and black player, respectively
+    function
+        Player that returns the next move of 'moves'
     """
-    # Get the number of intersections occupied by each player's stones
-    white_score, black_score = get_player_stones(goban)
+    moves = iter(moves)
 
-    # Iterate over the 'territories' of the 'goban'
-    territories = get_territories(goban)
-    for territory in territories:
-
-        # Get the 'border' (border) of the 'territory'
-        border = get_different_adjacents(goban,territory)
-        if len(border) == 0:
-            break
-        
-        # If the 'border' consists only of white stones,
-        # include the territory in the white player's score
-        if all(map(lambda x: is_white_stone(get_stone(goban,x)), \
-                   border)):
-            white_score += len(territory)
+    def player(goban,stone,history):
+        """Return the next move of the script, or None to pass"""
+        move = next(moves,None)
 
-        # If the 'border' consists only of black stones,
-        # include the territory in the black player's score
-        elif all(map(lambda x: is_black_stone(get_stone(goban,x)), \
-                   border)):
-            black_score += len(territory)
+        return None if move is None or move == "P" else str_to_intersection(move)
 
-    return (white_score,black_score)
+    return player
 
 
-def is_legal_move(goban,intersection,stone,previous_goban):
+def create_random_player(seed = None):
     """
-    Perform a move on a copy of a goban and check if it is legal
+    Return a player that performs uniformly random legal moves
+
+    The player does not fill its own eyes, and passes when it has no other
+    legal move, as in playout
 
     Parameters
     ----------
-    goban : goban
-        Goban to be copied
-    intersection : intersection
-        Intersection where the stone will be placed
-    stone : stone
-        Stone to be placed
-    previous_goban : goban
-        Goban obtained at the end of the player's last turn
+    seed : int, optional
+        Seed of the generator of the random moves
 
     Returns
     -------
-    bool
-        True if legal, False otherwise
+    function
+        Player that returns a random legal move, or None to pass
     """
-    # Get a copy of 'goban' and perform the move on it
-    goban_copy = copy_goban(goban)
-    make_move(goban_copy,intersection,stone)
+    rng = random.Random(seed)
 
-    # Check if the move is illegal, i.e. results in Suicide or Repetition (Ko)
-    if (
-        is_player_stone(get_stone(goban,intersection)) or
-        len(get_different_adjacents(goban_copy,get_chain(goban_copy,intersection))) == 0 or
-        gobans_equal(goban_copy,previous_goban)
-    ):
-        return False
-    
-    return True
+    def player(goban,stone,history):
+        """Return a random legal move that does not fill an eye, or None to pass"""
+        code = _CODES[stone]
+        moves = [x for x in get_legal_moves(goban,stone,history) \
+                 if not _is_eye(goban,_point(goban,x),code)]
 
+        return rng.choice(moves) if moves else None
 
-def player_turn(goban,stone,previous_goban):
+    return player
+
+
+def play_game(goban,black_player,white_player,history = None,on_turn = None,max_moves = None):
     """
-    Offer a player the option to pass or place their stone on an intersection
-    and return whether the player passed
+    Play a game between two players without the terminal and return its result
+
+    The black player moves first. The game ends when both players pass in a
+    row, and a move that repeats an earlier goban is illegal, as in go()
 
     Parameters
     ----------
     goban : goban
-        Goban where the game is played
-    stone : stone
-        Player's stone
-    previous_goban : goban
-        Goban obtained at the end of the player's last turn
+        Goban where the game is played, which is modified
+    black_player : function
+        Player that chooses the black player's moves
+    white_player : function
+        Player that chooses the white player's moves
+    history : set, optional
+        Hashes of every goban that occurred before 'goban' in the game
+    on_turn : function, optional
+        Function called with the goban at the start of every turn, e.g. to
+        show it
+    max_moves : int, optional
+        Maximum number of turns, after which the game ends
 
     Returns
     -------
-    bool
-        True if the player did not pass, False otherwise
+    tuple
+        Triple with the final goban, the list of pairs (stone, intersection)
+        of the moves, where the intersection is None for a pass, and the
+        scores of the white and black player, respectively
+
+    Raises
+    ------
+    ValueError:
+        If a player chooses an illegal move
     """
-    # Check the validity of the player's choice
-    choice = ""
-    while (
-        not len(choice) >= 2 or
-        not choice[0].isalpha() or
-        not "A" <= choice[0] <= "S" or
-        not choice[1:].isnumeric() or
-        not 1 <= int(choice[1:]) <= 19 or
-        not is_valid_intersection(goban,str_to_intersection(choice)) or
-        not is_legal_move(goban,str_to_intersection(choice),stone,previous_goban)
-    ):
-        # Check if the player passed their turn
-        if choice == "P":
-            return False
-            
-        choice = input("Escreva uma intersection ou 'P' para passar ["+stone_to_str(stone)+"]:")
+    history = set() if history is None else set(history)
+    history.add(get_hash(goban))
+    moves = []
+    stone = create_black_stone()
+    last_player_passed = False
 
-    make_move(goban,str_to_intersection(choice),stone)
+    while max_moves is None or len(moves) < max_moves:
+        # Measure the turn if instrumentation is enabled
+        turn = None if _STATS is None else _start_turn()
 
-    return True
+        if on_turn is not None:
+            on_turn(goban)
+
+        player = black_player if is_black_stone(stone) else white_player
+        intersection = player(goban,stone,history)
+
+        if intersection is not None:
+            if not is_legal_move(goban,intersection,stone,None,history):
+                raise ValueError("play_game: jogada ilegal")
+
+            make_move(goban,intersection,stone)
+            history.add(get_hash(goban))    # Save the hash of the goban
+
+        moves.append((stone,intersection))
+
+        if turn is not None:
+            _end_turn(turn)
 
+        # End the game if both players have passed
+        if last_player_passed and intersection is None:
+            break
+
+        last_player_passed = intersection is None    # Save whether the player passed
+        stone = create_white_stone() if is_black_stone(stone) else create_black_stone()    # Switch player
+
+    return goban, moves, calculate_scores(goban)
 
-def go(n,white_stones,black_stones):
+
+def go(n,white_stones,black_stones,white_player = None,black_player = None):
     """
     Play GO and return whether the white player won
 
@@ -1191,6 +3445,13 @@ def go(n,white_stones,black_stones):
         External representations of intersections to occupy with white stones
     black_stones : tuple
         External representations of intersections to occupy with black stones
+    white_player : function, optional
+        Player that chooses the white player's moves instead of the terminal,
+        i.e. a function that receives the goban, the player's stone and the
+        hashes of the earlier gobans and returns the intersection of a legal
+        move or None to pass
+    black_player : function, optional
+        Player that chooses the black player's moves instead of the terminal
 
     Returns
     -------
@@ -1204,10 +3465,12 @@ def go(n,white_stones,black_stones):
         If 'white_stones' or 'black_stones' are not tuples
         If 'white_stones' or 'black_stones' do not contain valid external
         representations of valid intersections of an n x n goban
+        If 'white_player' or 'black_player' choose an illegal move
     """
     # Inner Function
-    def show_game():
+    def show_game(goban):
         """Show the players their score and the goban"""
+        white_score, black_score = get_tracked_scores(tracker)
         print("Branco (O) tem",white_score,"pontos")
         print("Preto (X) tem",black_score,"pontos")
         print(goban_to_str(goban))
@@ -1235,46 +3498,195 @@ def go(n,white_stones,black_stones):
         raise ValueError("go: argumentos invalidos")
 
     goban = create_goban(n,white_stones,black_stones)    # Create goban
-    previous_goban1,previous_goban2 = 2*(copy_goban(goban),)
-    end = False
-    player1 = True
-    last_player_passed = False
-
-    # Play
-    while not end:
-        # Show the players their score and the goban
-        white_score, black_score = calculate_scores(goban)
-        show_game()
-
-        player_passed = False
-
-        # Player's turn
-        if player1:
-            # Check if the player passed
-            if not player_turn(goban,create_black_stone(),previous_goban1):
-                player_passed = True
-            else:
-                previous_goban1 = copy_goban(goban)    # Save copy of goban
-
-        else:
-            # Check if the player passed
-            if not player_turn(goban,create_white_stone(),previous_goban2):
-                player_passed = True
-            else:
-                previous_goban2 = copy_goban(goban)    # Save copy of goban
-        
-        # End the game if both players have passed
-        if last_player_passed and player_passed:
-            end = True
-
-        last_player_passed = player_passed    # Save whether the player passed
-        player1 = not player1    # Switch player
+    tracker = create_score_tracker(goban)    # Update the scores as the goban changes
+
+    # Play, showing the players their score and the goban every turn
+    try:
+        goban, moves, (white_score, black_score) = play_game(
+            goban,black_player or terminal_player,white_player or terminal_player,on_turn = show_game)
+    except ValueError as error:
+        # Only the illegal moves of the players are reported as those of go()
+        if str(error) != "play_game: jogada ilegal":
+            raise
+        raise ValueError("go: jogada ilegal") from error
 
     # Show the players their score and the goban
-    show_game()
+    show_game(goban)
 
     # Check if the white player won
     if white_score >= black_score:
         return True
     
-    return False
\ No newline at end of file
+    return False
+
+
+# Instrumentation
+# The instrumented functions check _STATS when they are called: while it is
+# None they run as usual, at the cost of that check, and while instrumentation
+# is enabled they call themselves again through _measure, which counts and
+# times the call. Calls from any module, any thread and from the functions of
+# this module are measured alike. Only one thread at a time can enable it
+# -> _STATS: statistics being collected, or None if disabled
+# -> _OWNER: identifier of the thread that enabled instrumentation
+# -> _MEASURED: pairs of a thread identifier and the name of a function whose
+#    call by that thread is being measured, so that the calls made by
+#    _measure run as usual
+# -> _LAST_STATS: statistics collected while instrumentation was last enabled
+_STATS = None
+_OWNER = None
+_MEASURED = set()
+_LAST_STATS = None
+_LOCK = threading.Lock()
+_INSTRUMENTED = (
+    "get_chain","get_different_adjacents","copy_goban","gobans_equal","make_move",
+    "is_legal_move","calculate_scores","get_tracked_scores","goban_to_str"
+)
+
+
+def _create_stats():
+    """
+    Return the statistics of instrumentation before any call is measured
+
+    Returns
+    -------
+    dict
+        Dictionary with:
+        -> "calls": number of calls to each instrumented function, where
+           "make_move" counts every move performed with an undo record, also
+           by the functions of this module
+        -> "seconds": time spent in each instrumented function, including the
+           functions it calls
+        -> "captures": number of moves that captured stones, including the
+           moves of playouts
+        -> "captured_stones": number of stones captured by those moves
+        -> "checked_moves": number of moves checked for Suicide and captures,
+           by is_legal_move, get_legal_moves, playouts and the players
+        -> "rejections": number of moves rejected by is_legal_move because
+           the intersection was occupied ("occupied"), the move was a Suicide
+           ("suicide"), repeated a goban of the history ("ko") or the
+           previous goban ("repetition")
+        -> "turns": for each turn of go(), the time spent calculating the
+           scores ("scoring"), checking the legality of moves ("legality"),
+           representing the goban ("rendering") and in the whole turn
+           ("total")
+    """
+    return {
+        "calls": {name: 0 for name in _INSTRUMENTED},
+        "seconds": {name: 0.0 for name in _INSTRUMENTED},
+        "captures": 0,
+        "captured_stones": 0,
+        "checked_moves": 0,
+        "rejections": {kind: 0 for kind in (_OCCUPIED,_SUICIDE,_KO,"repetition")},
+        "turns": []
+    }
+
+
+def _measure(name,function,*args):
+    """
+    Call an instrumented function, counting and timing the call
+
+    Parameters
+    ----------
+    name : str
+        Name under which the call is counted
+    function : function
+        Function to call, which runs as usual while 'name' is being measured
+    *args
+        Arguments of the call
+
+    Returns
+    -------
+    any
+        Result of the call
+    """
+    stats = _STATS
+    key = (threading.get_ident(),name)
+    _MEASURED.add(key)
+    start = time.perf_counter()
+
+    try:
+        return function(*args)
+    finally:
+        stats["seconds"][name] += time.perf_counter() - start
+        stats["calls"][name] += 1
+        _MEASURED.discard(key)
+
+
+def _start_turn():
+    """Return the clock and the times measured so far at the start of a turn of go()"""
+    seconds = _STATS["seconds"]
+
+    return (time.perf_counter(),seconds["calculate_scores"] + seconds["get_tracked_scores"],
+            seconds["is_legal_move"],seconds["goban_to_str"])
+
+
+def _end_turn(start):
+    """Record the times of a turn of go() started at the clock and times 'start'"""
+    if _STATS is None:
+        return
+
+    seconds = _STATS["seconds"]
+    _STATS["turns"].append({
+        "scoring": seconds["calculate_scores"] + seconds["get_tracked_scores"] - start[1],
+        "legality": seconds["is_legal_move"] - start[2],
+        "rendering": seconds["goban_to_str"] - start[3],
+        "total": time.perf_counter() - start[0]
+    })
+
+
+@contextlib.contextmanager
+def instrumentation():
+    """
+    Enable the instrumentation of the go module while a with block runs
+
+    The statistics start empty and can be obtained with get_stats both inside
+    the block and after it. Nested blocks keep collecting the statistics of
+    the outermost one, and the calls of every thread are collected while it
+    runs, but only the thread that entered it can enter another block
+
+    Returns
+    -------
+    context manager
+        Context manager that disables the instrumentation when the block ends
+
+    Raises
+    ------
+    ValueError:
+        If another thread has enabled instrumentation
+    """
+    global _STATS, _OWNER, _LAST_STATS
+
+    with _LOCK:
+        nested = _STATS is not None
+        if nested and _OWNER != threading.get_ident():
+            raise ValueError("instrumentation: instrumentacao ativa noutra thread")
+        if not nested:
+            _OWNER = threading.get_ident()
+            _STATS = _create_stats()
+
+    if nested:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        with _LOCK:
+            _LAST_STATS = _STATS
+            _STATS = _OWNER = None
+
+
+def get_stats():
+    """
+    Return a snapshot of the statistics of instrumentation
+
+    Returns
+    -------
+    dict or None
+        Copy of the statistics being collected or, if instrumentation is
+        disabled, of the last ones collected, as described in _create_stats,
+        or None if instrumentation was never enabled
+    """
+    stats = _STATS or _LAST_STATS
+
+    return copy.deepcopy(stats)
@@ -0,0 +1,328 @@
+"""
+Description
+-----------
+This module plays the go module through the Go Text Protocol (GTP), so it can
+be used by Go GUIs and match tools over the standard input and output
+
+The engine keeps a single goban that is updated with make_move and restored
+with unmake_move, so every command takes time proportional to the stones it
+places and captures. As in go(), a move that repeats an earlier goban is
+illegal and the white player wins ties. GTP vertices skip the letter I, so
+the GTP column J is the column I of the go module, as shown by showboard
+
+An engine is represented by a dictionary with:
+-> "goban": goban of the game
+-> "history": hashes of every goban of the game
+-> "moves": for each move, a pair with the hash the move added to "history"
+   (None for a pass) and its undo record (None for a pass)
+-> "komi": komi given by the controller, added to the white player's score
+   in final_score
+-> "player": player that chooses the moves of genmove
+-> "running": False after the quit command
+
+Usage
+-----
+python3 gtp.py [--playouts N] [--processes N] [--seed N]
+
+Functions
+---------
+create_engine(player)
+    Return an engine with an empty 19x19 goban
+handle_command(engine,line)
+    Run a GTP command and return the response
+main(arguments)
+    Run an engine over the standard input and output
+"""
+
+import argparse
+import sys
+
+from go import (
+    calculate_scores, create_black_stone, create_empty_goban,
+    create_intersection, create_white_stone, get_col, get_hash, get_row,
+    goban_to_str, is_legal_move, make_move, unmake_move
+)
+from mcts import create_mcts_player
+
+# Columns of GTP vertices, which skip the letter I
+COLUMNS = "ABCDEFGHJKLMNOPQRST"
+
+
+def create_engine(player = None):
+    """
+    Return an engine with an empty 19x19 goban
+
+    Parameters
+    ----------
+    player : function, optional
+        Player that chooses the moves of genmove, i.e. a function that
+        receives a goban, the player's stone and the hashes of the earlier
+        gobans and returns an intersection or None to pass. By default, an
+        MCTS player with 1000 playouts in a single process
+
+    Returns
+    -------
+    dict
+        Engine without moves
+    """
+    if player is None:
+        player = create_mcts_player(playouts = 1000,processes = 1)
+
+    return {
+        "goban": create_empty_goban(19),
+        "history": {0},
+        "moves": [],
+        "komi": 0.0,
+        "player": player,
+        "running": True
+    }
+
+
+def _to_stone(color):
+    """
+    Return the stone of a GTP color
+
+    Raises
+    ------
+    ValueError:
+        If 'color' is not a GTP color
+    """
+    color = color.lower()
+
+    if color in ("b","black"):
+        return create_black_stone()
+    if color in ("w","white"):
+        return create_white_stone()
+
+    raise ValueError("invalid color")
+
+
+def _to_intersection(vertex,n):
+    """
+    Return the intersection of a GTP vertex, or None for a pass
+
+    Raises
+    ------
+    ValueError:
+        If 'vertex' is not a vertex of an n x n goban
+    """
+    vertex = vertex.upper()
+
+    if vertex == "PASS":
+        return None
+
+    if len(vertex) < 2 or vertex[0] not in COLUMNS[:n] or not vertex[1:].isdigit() or \
+       not 1 <= int(vertex[1:]) <= n:
+        raise ValueError("invalid coordinate")
+
+    return create_intersection(chr(ord("A") + COLUMNS.index(vertex[0])),int(vertex[1:]))
+
+
+def _to_vertex(intersection):
+    """Return the GTP vertex of an intersection, or "pass" for None"""
+    if intersection is None:
+        return "pass"
+
+    return COLUMNS[ord(get_col(intersection)) - ord("A")] + str(get_row(intersection))
+
+
+def _play(engine,stone,intersection):
+    """
+    Perform a move of a player, or a pass if 'intersection' is None
+
+    Raises
+    ------
+    ValueError:
+        If the move is illegal
+    """
+    if intersection is None:
+        engine["moves"].append((None,None))
+        return
+
+    goban = engine["goban"]
+    if not is_legal_move(goban,intersection,stone,None,engine["history"]):
+        raise ValueError("illegal move")
+
+    undo = make_move(goban,intersection,stone,True)
+    engine["history"].add(get_hash(goban))
+    engine["moves"].append((get_hash(goban),undo))
+
+
+def _boardsize(engine,arguments):
+    """Change the dimension of the goban and clear it"""
+    if len(arguments) != 1 or not arguments[0].isdigit() or int(arguments[0]) not in (9,13,19):
+        raise ValueError("unacceptable size")
+
+    engine["goban"] = create_empty_goban(int(arguments[0]))
+    _clear_board(engine,[])
+
+    return ""
+
+
+def _clear_board(engine,arguments):
+    """Remove every stone of the goban and forget the moves"""
+    engine["goban"] = create_empty_goban(engine["goban"]["size"])
+    engine["history"] = {get_hash(engine["goban"])}
+    engine["moves"] = []
+
+    return ""
+
+
+def _komi(engine,arguments):
+    """Set the komi"""
+    try:
+        engine["komi"] = float(arguments[0])
+    except (IndexError,ValueError):
+        raise ValueError("syntax error")
+
+    return ""
+
+
+def _play_command(engine,arguments):
+    """Perform a move given by the controller"""
+    if len(arguments) != 2:
+        raise ValueError("syntax error")
+
+    _play(engine,_to_stone(arguments[0]),_to_intersection(arguments[1],engine["goban"]["size"]))
+
+    return ""
+
+
+def _genmove(engine,arguments):
+    """Perform and return a move chosen by the player of the engine"""
+    if len(arguments) != 1:
+        raise ValueError("syntax error")
+
+    stone = _to_stone(arguments[0])
+    intersection = engine["player"](engine["goban"],stone,engine["history"])
+    _play(engine,stone,intersection)
+
+    return _to_vertex(intersection)
+
+
+def _undo(engine,arguments):
+    """Undo the last move"""
+    if not engine["moves"]:
+        raise ValueError("cannot undo")
+
+    move_hash, undo = engine["moves"].pop()
+    if undo is not None:
+        engine["history"].discard(move_hash)
+        unmake_move(engine["goban"],undo)
+
+    return ""
+
+
+def _final_score(engine,arguments):
+    """Return the result of the game, the white player winning ties"""
+    white_score, black_score = calculate_scores(engine["goban"])
+    difference = white_score + engine["komi"] - black_score
+
+    return "{}+{:g}".format("W" if difference >= 0 else "B",abs(difference))
+
+
+def _showboard(engine,arguments):
+    """Return the representation of the goban"""
+    return goban_to_str(engine["goban"])
+
+
+def _quit(engine,arguments):
+    """Stop the engine"""
+    engine["running"] = False
+
+    return ""
+
+
+# Handler of each command, which receives the engine and the arguments of the
+# command and returns the response or raises ValueError with the error message
+_COMMANDS = {
+    "protocol_version": lambda engine, arguments: "2",
+    "name": lambda engine, arguments: "go",
+    "version": lambda engine, arguments: "1.0",
+    "known_command": lambda engine, arguments: str(bool(arguments) and arguments[0] in _COMMANDS).lower(),
+    "list_commands": lambda engine, arguments: "\n".join(sorted(_COMMANDS)),
+    "boardsize": _boardsize,
+    "clear_board": _clear_board,
+    "komi": _komi,
+    "play": _play_command,
+    "genmove": _genmove,
+    "undo": _undo,
+    "final_score": _final_score,
+    "showboard": _showboard,
+    "quit": _quit
+}
+
+
+def handle_command(engine,line):
+    """
+    Run a GTP command and return the response
+
+    Parameters
+    ----------
+    engine : dict
+        Engine that runs the command
+    line : str
+        Line with an optional numeric id, the command and its arguments
+
+    Returns
+    -------
+    str or None
+        Response to the command, ending with an empty line, or None if the
+        line has no command
+    """
+    line = "".join(x for x in line.split("#",1)[0] if x >= " " or x == "\t").replace("\t"," ")
+    words = line.split()
+    if not words:
+        return None
+
+    identifier = ""
+    if words[0].isdigit():
+        identifier = words.pop(0)
+    if not words:
+        return None
+
+    command, arguments = words[0], words[1:]
+    if command not in _COMMANDS:
+        return "?{} unknown command\n\n".format(identifier)
+
+    try:
+        response = _COMMANDS[command](engine,arguments)
+    except ValueError as error:
+        return "?{} {}\n\n".format(identifier,error)
+
+    return "={} {}\n\n".format(identifier,response) if response else "={}\n\n".format(identifier)
+
+
+def main(arguments = None):
+    """
+    Run an engine over the standard input and output
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+    """
+    parser = argparse.ArgumentParser(description = "Play the go module through the Go Text Protocol")
+    parser.add_argument("--playouts",type = int,default = 1000,help = "playouts of each generated move")
+    parser.add_argument("--processes",type = int,default = 1,help = "processes of the search")
+    parser.add_argument("--seed",type = int,default = 0,help = "seed of the search")
+    arguments = parser.parse_args(arguments)
+
+    player = create_mcts_player(arguments.playouts,None,arguments.processes,arguments.seed)
+    engine = create_engine(player)
+
+    try:
+        for line in sys.stdin:
+            response = handle_command(engine,line)
+            if response is not None:
+                sys.stdout.write(response)
+                sys.stdout.flush()
+
+            if not engine["running"]:
+                break
+    finally:
+        player.close()
+
+
+if __name__ == "__main__":
+    main()
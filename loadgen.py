@@ -0,0 +1,219 @@
+"""
+Description
+-----------
+This module generates load on the game server of server.py and reports its
+throughput and latency
+
+Every simulated client plays whole games on its own connection: the black
+player's moves are random legal moves that do not fill its own eyes, chosen
+by create_random_player on a goban the client keeps with the go module and
+sent with "play", and the white player's moves are asked for with
+"genmove". Each game ends when both players pass in a row, or after
+a maximum number of moves, and is then scored
+
+Usage
+-----
+python3 loadgen.py [--host HOST] [--port PORT] [--unix PATH] [--games N] [--clients N]
+
+Functions
+---------
+play_games(games,clients,n,host,port,unix,max_moves,seed)
+    Play games on the server and return the latency of every move
+percentile(values,fraction)
+    Return a percentile of a list of values
+main(arguments)
+    Play games on the server and print the moves per second and latencies
+"""
+
+import argparse
+import asyncio
+import time
+
+from go import (
+    create_black_stone, create_empty_goban, create_random_player,
+    create_white_stone, get_hash, intersection_to_str, make_move,
+    str_to_intersection
+)
+
+
+async def _request(reader,writer,line):
+    """
+    Send a request and return its result
+
+    Raises
+    ------
+    ValueError:
+        If the server answers with an error
+    """
+    writer.write(line.encode("ascii") + b"\n")
+    response = (await reader.readline()).decode("ascii").rstrip("\n")
+
+    if not response.startswith("="):
+        raise ValueError("{}: {}".format(line,response))
+
+    return response[2:]
+
+
+async def _client(queue,n,connect,max_moves,player,latencies):
+    """
+    Play the games of a queue on a connection of its own
+
+    Parameters
+    ----------
+    queue : list
+        Games still to be played, consumed by all the clients
+    n : int
+        Dimension of the gobans
+    connect : function
+        Function without parameters returning a coroutine that opens a
+        connection to the server
+    max_moves : int
+        Maximum number of moves of each game
+    player : function
+        Player that chooses the black player's moves
+    latencies : list
+        List where the latency of each move is appended, in seconds
+    """
+    reader, writer = await connect()
+
+    try:
+        while queue:
+            queue.pop()
+            identifier = await _request(reader,writer,"new {}".format(n))
+            goban = create_empty_goban(n)
+            history = {get_hash(goban)}
+            passes = 0
+
+            for turn in range(max_moves):
+                if turn % 2 == 0:
+                    stone = create_black_stone()
+                    intersection = player(goban,stone,history)
+                    move = "P" if intersection is None else intersection_to_str(intersection)
+                    request = "play {} B {}".format(identifier,move)
+                else:
+                    stone = create_white_stone()
+                    request = "genmove {} W".format(identifier)
+
+                start = time.perf_counter()
+                result = await _request(reader,writer,request)
+                latencies.append(time.perf_counter() - start)
+
+                if turn % 2 == 1:
+                    move = result
+
+                if move == "P":
+                    passes += 1
+                    if passes == 2:
+                        break
+                else:
+                    passes = 0
+                    make_move(goban,str_to_intersection(move),stone)
+                    history.add(get_hash(goban))
+
+            await _request(reader,writer,"score {}".format(identifier))
+            await _request(reader,writer,"close {}".format(identifier))
+    finally:
+        writer.close()
+
+
+async def play_games(games,clients,n = 9,host = "127.0.0.1",port = 9999,unix = None,max_moves = 200,seed = 0):
+    """
+    Play games on the server and return the latency of every move
+
+    Parameters
+    ----------
+    games : int
+        Number of games to play
+    clients : int
+        Number of simultaneous connections, each playing one game at a time
+    n : int, optional
+        Dimension of the gobans
+    host : str, optional
+        Address of the server
+    port : int, optional
+        TCP port of the server
+    unix : str, optional
+        Path of the Unix socket of the server, used instead of TCP
+    max_moves : int, optional
+        Maximum number of moves of each game
+    seed : int, optional
+        Seed of the black player's moves
+
+    Returns
+    -------
+    list
+        Latency of each move, in seconds
+    """
+    def connect():
+        """Return a coroutine that opens a connection to the server"""
+        if unix is not None:
+            return asyncio.open_unix_connection(unix)
+        return asyncio.open_connection(host,port)
+
+    queue = list(range(games))
+    latencies = []
+
+    await asyncio.gather(*(_client(queue,n,connect,max_moves,create_random_player(seed + i),latencies) \
+                           for i in range(clients)))
+
+    return latencies
+
+
+def percentile(values,fraction):
+    """
+    Return a percentile of a list of values
+
+    Parameters
+    ----------
+    values : list
+        Values, not necessarily sorted
+    fraction : float
+        Fraction of the values that are at most the percentile, e.g. 0.99
+
+    Returns
+    -------
+    float
+        Smallest value such that at least 'fraction' of the values are not
+        greater, or 0.0 if there are no values
+    """
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+
+    return values[min(len(values) - 1,max(0,int(-(-fraction*len(values)//1)) - 1))]
+
+
+def main(arguments = None):
+    """
+    Play games on the server and print the moves per second and latencies
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+    """
+    parser = argparse.ArgumentParser(description = "Generate load on the game server")
+    parser.add_argument("--host",default = "127.0.0.1",help = "address of the server")
+    parser.add_argument("--port",type = int,default = 9999,help = "TCP port of the server")
+    parser.add_argument("--unix",help = "path of the Unix socket of the server")
+    parser.add_argument("--games",type = int,default = 1000,help = "number of games")
+    parser.add_argument("--clients",type = int,default = 100,help = "simultaneous connections")
+    parser.add_argument("--size",type = int,default = 9,help = "dimension of the gobans")
+    parser.add_argument("--max-moves",type = int,default = 200,help = "maximum moves of each game")
+    parser.add_argument("--seed",type = int,default = 0,help = "seed of the black player's moves")
+    arguments = parser.parse_args(arguments)
+
+    start = time.perf_counter()
+    latencies = asyncio.run(play_games(arguments.games,arguments.clients,arguments.size,arguments.host,
+                                       arguments.port,arguments.unix,arguments.max_moves,arguments.seed))
+    elapsed = time.perf_counter() - start
+
+    print("{} games, {} moves in {:.1f} s".format(arguments.games,len(latencies),elapsed))
+    print("{:.0f} moves/s".format(len(latencies)/elapsed))
+    print("latency p50 {:.2f} ms, p99 {:.2f} ms".format(1000*percentile(latencies,0.5),
+                                                        1000*percentile(latencies,0.99)))
+
+
+if __name__ == "__main__":
+    main()
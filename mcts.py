@@ -0,0 +1,298 @@
+"""
+Description
+-----------
+This module implements a Monte Carlo Tree Search (UCT) player for the go module
+
+The search performs and undoes moves with make_move and unmake_move and only
+considers the moves returned by get_legal_moves, so it follows the same
+Suicide and Repetition (Ko) rules as the interactive game. Root parallelism
+runs independent searches in a process pool and merges their visit counts
+
+Functions
+---------
+search(goban,stone,history,playouts,seconds,seed)
+    Search the moves of a player with UCT and return the statistics of each move
+choose_move(goban,stone,history,playouts,seconds,processes,seed,executor)
+    Return the move chosen by a parallel search, or None to pass
+create_mcts_player(playouts,seconds,processes,seed)
+    Return a player that chooses its moves with choose_move, and can be closed
+"""
+
+import concurrent.futures
+import math
+import os
+import random
+import time
+
+from go import (
+    calculate_scores, copy_goban, create_black_stone, create_white_stone,
+    get_hash, get_legal_moves, intersection_to_str, is_white_stone, make_move,
+    playout, str_to_intersection, unmake_move
+)
+
+# Exploration constant of the UCT formula
+EXPLORATION = 1.4
+
+
+def _create_node(move,stone):
+    """
+    Return a node of the search tree
+
+    Parameters
+    ----------
+    move : intersection or None
+        Move that leads to the node, or None for a pass
+    stone : stone
+        Stone of the player who performed 'move'
+
+    Returns
+    -------
+    dict
+        Node without visits and with its moves still to be generated
+    """
+    return {"move": move, "stone": stone, "visits": 0, "wins": 0, "children": [], "untried": None}
+
+
+def _opponent(stone):
+    """Return the stone of the opponent of the player of a stone"""
+    return create_black_stone() if is_white_stone(stone) else create_white_stone()
+
+
+def search(goban,stone,history = None,playouts = 1000,seconds = None,seed = 0):
+    """
+    Search the moves of a player with UCT and return the statistics of each move
+
+    Each iteration descends the tree choosing the child with the best upper
+    confidence bound, expands one untried move, finishes the game with a
+    random playout and counts a win for the players who won it. White wins
+    ties, as in go()
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the player moves, which is not modified
+    stone : stone
+        Player's stone
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
+    playouts : int, optional
+        Maximum number of iterations
+    seconds : float, optional
+        Maximum duration of the search
+    seed : int, optional
+        Seed of the generator of the random moves
+
+    Returns
+    -------
+    dict
+        Pair (visits, wins) of each move at the root of the tree, indexed by
+        the external representation of its intersection or by "P" for a pass
+
+    Raises
+    ------
+    ValueError:
+        If both 'playouts' and 'seconds' are None, i.e. the search has no end
+    """
+    if playouts is None and seconds is None:
+        raise ValueError("search: argumentos invalidos")
+
+    goban = copy_goban(goban)
+    history = set() if history is None else set(history)
+    history.add(get_hash(goban))
+    rng = random.Random(seed)
+    root = _create_node(None,_opponent(stone))
+    deadline = None if seconds is None else time.perf_counter() + seconds
+
+    iterations = 0
+    while (
+        (playouts is None or iterations < playouts) and
+        (deadline is None or time.perf_counter() < deadline)
+    ):
+        node = root
+        path = [root]
+        undos = []
+        passes = 0
+
+        # Selection: descend while the node has no untried moves
+        while node["untried"] == [] and node["children"] and passes < 2:
+            logarithm = math.log(node["visits"])
+            node = max(node["children"],key = lambda x: x["wins"]/x["visits"] + \
+                       EXPLORATION*math.sqrt(logarithm/x["visits"]))
+            passes = passes + 1 if node["move"] is None else 0
+            if node["move"] is not None:
+                undos.append(make_move(goban,node["move"],node["stone"],True))
+                history.add(get_hash(goban))
+            path.append(node)
+
+        # Expansion: generate the moves of the node and try one of them
+        if passes < 2:
+            if node["untried"] is None:
+                node["untried"] = list(get_legal_moves(goban,_opponent(node["stone"]),history)) + [None]
+                rng.shuffle(node["untried"])
+
+            if node["untried"]:
+                child = _create_node(node["untried"].pop(),_opponent(node["stone"]))
+                node["children"].append(child)
+                passes = passes + 1 if child["move"] is None else 0
+                if child["move"] is not None:
+                    undos.append(make_move(goban,child["move"],child["stone"],True))
+                    history.add(get_hash(goban))
+                node = child
+                path.append(node)
+
+        # Simulation: finish the game with a random playout
+        if passes < 2:
+            white_score, black_score = playout(goban,_opponent(node["stone"]),rng,history)
+        else:
+            white_score, black_score = calculate_scores(goban)
+        white_won = white_score >= black_score
+
+        # Backpropagation
+        for visited in path:
+            visited["visits"] += 1
+            if is_white_stone(visited["stone"]) == white_won:
+                visited["wins"] += 1
+
+        for undo in reversed(undos):
+            history.discard(get_hash(goban))
+            unmake_move(goban,undo)
+
+        iterations += 1
+
+    return {
+        ("P" if child["move"] is None else intersection_to_str(child["move"])): \
+            (child["visits"],child["wins"])
+        for child in root["children"]
+    }
+
+
+def choose_move(goban,stone,history = None,playouts = 1000,seconds = None,processes = None,
+                seed = 0,executor = None):
+    """
+    Return the move chosen by a parallel search, or None to pass
+
+    The playouts are split among independent searches run in a process pool,
+    and the move with most visits over all of them is chosen
+
+    Parameters
+    ----------
+    goban : goban
+        Goban where the player moves
+    stone : stone
+        Player's stone
+    history : set, optional
+        Hashes of every goban that occurred earlier in the game
+    playouts : int, optional
+        Maximum number of iterations over all the searches
+    seconds : float, optional
+        Maximum duration of each search
+    processes : int, optional
+        Number of searches, by default the number of processors
+    seed : int, optional
+        Seed of the first search, each following search using the next seed
+    executor : concurrent.futures.Executor, optional
+        Pool where the searches run. If not given and 'processes' is greater
+        than 1, a pool is started for this move and shut down afterwards; its
+        startup is not counted in 'seconds', so the move takes longer than
+        'seconds'. Callers choosing several moves should keep a pool, as the
+        players of create_mcts_player do
+
+    Returns
+    -------
+    intersection or None
+        Intersection of the chosen move, or None to pass
+
+    Raises
+    ------
+    ValueError:
+        If both 'playouts' and 'seconds' are None
+    """
+    if playouts is None and seconds is None:
+        raise ValueError("choose_move: argumentos invalidos")
+
+    processes = processes or os.cpu_count() or 1
+    budget = None if playouts is None else max(1,playouts//processes)
+
+    if processes == 1:
+        results = [search(goban,stone,history,budget,seconds,seed)]
+    else:
+        pool = executor or concurrent.futures.ProcessPoolExecutor(processes)
+        try:
+            futures = [pool.submit(search,goban,stone,history,budget,seconds,seed + i) \
+                       for i in range(processes)]
+            results = [future.result() for future in futures]
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    # Merge the visit counts of the root moves of every search
+    visits = {}
+    for result in results:
+        for move, (move_visits, wins) in result.items():
+            visits[move] = visits.get(move,0) + move_visits
+
+    if not visits:
+        return None
+
+    move = max(sorted(visits),key = lambda x: visits[x])
+    if move == "P":
+        return None
+
+    return str_to_intersection(move)
+
+
+def create_mcts_player(playouts = 1000,seconds = None,processes = None,seed = 0):
+    """
+    Return a player that chooses its moves with choose_move, and can be closed
+
+    The player starts one process pool on its first move and keeps it for all
+    its moves. Its worker processes stay alive until the player's close()
+    is called, which shuts the pool down; a move after that starts a new pool
+
+    Parameters
+    ----------
+    playouts : int, optional
+        Maximum number of iterations per move
+    seconds : float, optional
+        Maximum duration of the search of each move
+    processes : int, optional
+        Number of parallel searches, by default the number of processors
+    seed : int, optional
+        Seed of the searches of the first move
+
+    Returns
+    -------
+    function
+        Player, i.e. a function that receives a goban, the player's stone and
+        the hashes of the earlier gobans and returns an intersection or None
+        to pass, with a close() function that shuts its pool down
+
+    Raises
+    ------
+    ValueError:
+        If both 'playouts' and 'seconds' are None
+    """
+    if playouts is None and seconds is None:
+        raise ValueError("create_mcts_player: argumentos invalidos")
+
+    processes = processes or os.cpu_count() or 1
+    state = {"executor": None, "move": 0}
+
+    def player(goban,stone,history):
+        """Return the move chosen for a player, or None to pass"""
+        if processes > 1 and state["executor"] is None:
+            state["executor"] = concurrent.futures.ProcessPoolExecutor(processes)
+
+        state["move"] += 1
+        return choose_move(goban,stone,history,playouts,seconds,processes,
+                           seed + state["move"]*processes,state["executor"])
+
+    def close():
+        """Shut the process pool of the player down, waiting for its processes"""
+        if state["executor"] is not None:
+            state["executor"].shutdown()
+            state["executor"] = None
+
+    player.close = close
+
+    return player
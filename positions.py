@@ -0,0 +1,262 @@
+"""
+Description
+-----------
+This module keeps large numbers of gobans of the go module in an append-only
+file of packed positions, read through mmap
+
+A position file starts with a header of HEADER_SIZE bytes, with the magic
+bytes MAGIC and the dimension n of its gobans, followed by the gobans packed
+by pack_goban, all of the same length. Position k is found at a fixed offset,
+so it is read without loading the rest of the file
+
+A store is represented by a dictionary with:
+-> "size": dimension n of the gobans
+-> "file": the open position file
+-> "mmap": memory map of the file
+-> "record_size": number of bytes of each packed goban
+-> "length": number of positions in the file when it was opened
+
+Functions
+---------
+create_store(path,n)
+    Create an empty position file for n x n gobans
+append_gobans(path,gobans)
+    Append gobans to a position file and return the index of the first one
+open_store(path)
+    Return a store reading a position file
+close_store(store)
+    Close a store
+store_length(store)
+    Return the number of positions of a store
+get_packed(store,k)
+    Return the packed representation of position k of a store
+get_goban(store,k)
+    Return the goban of position k of a store
+"""
+
+import mmap
+import os
+
+from go import create_empty_goban, pack_goban, unpack_goban
+
+# Magic bytes at the start of a position file, and length of its header
+MAGIC = b"GOPOS\x01"
+HEADER_SIZE = 8
+
+
+def _record_size(n):
+    """Return the number of bytes of a packed n x n goban"""
+    return (n*n + 3)//4
+
+
+def _read_header(file):
+    """
+    Return the dimension of the gobans of a position file
+
+    Parameters
+    ----------
+    file : file
+        Binary file positioned at its start
+
+    Returns
+    -------
+    int
+        Dimension n of the gobans of the file
+
+    Raises
+    ------
+    ValueError:
+        If 'file' does not start with the header of a position file
+    """
+    header = file.read(HEADER_SIZE)
+
+    if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC or header[len(MAGIC)] not in (9,13,19):
+        raise ValueError("ficheiro de posicoes invalido")
+
+    return header[len(MAGIC)]
+
+
+def create_store(path,n):
+    """
+    Create an empty position file for n x n gobans
+
+    Parameters
+    ----------
+    path : str
+        Path of the file, which must not exist
+    n : int
+        Dimension of the gobans
+
+    Raises
+    ------
+    ValueError:
+        If 'n' is not the integer 9, 13, or 19
+    FileExistsError:
+        If 'path' already exists
+    """
+    create_empty_goban(n)    # Check the dimension
+
+    with open(path,"xb") as file:
+        file.write(MAGIC + bytes((n,)) + bytes(HEADER_SIZE - len(MAGIC) - 1))
+
+
+def append_gobans(path,gobans):
+    """
+    Append gobans to a position file and return the index of the first one
+
+    Parameters
+    ----------
+    path : str
+        Path of a file created by create_store
+    gobans : iterable
+        Gobans to append, of the dimension of the file
+
+    Returns
+    -------
+    int
+        Index of the first appended goban in the file
+
+    Raises
+    ------
+    ValueError:
+        If 'path' is not a position file
+        If a goban is not of the dimension of the file
+    """
+    with open(path,"r+b") as file:
+        n = _read_header(file)
+        record_size = _record_size(n)
+
+        # Ignore an incomplete record left by an interrupted append
+        end = file.seek(0,os.SEEK_END)
+        first = (end - HEADER_SIZE)//record_size
+        file.truncate(HEADER_SIZE + first*record_size)
+        file.seek(HEADER_SIZE + first*record_size)
+
+        for goban in gobans:
+            if goban["size"] != n:
+                raise ValueError("append_gobans: argumentos invalidos")
+            file.write(pack_goban(goban))
+
+    return first
+
+
+def open_store(path):
+    """
+    Return a store reading a position file
+
+    Positions appended after the store is opened are not seen by it
+
+    Parameters
+    ----------
+    path : str
+        Path of a file created by create_store
+
+    Returns
+    -------
+    dict
+        Store with the positions of the file
+
+    Raises
+    ------
+    ValueError:
+        If 'path' is not a position file
+    """
+    file = open(path,"rb")
+
+    try:
+        n = _read_header(file)
+        memory_map = mmap.mmap(file.fileno(),0,access = mmap.ACCESS_READ)
+    except BaseException:
+        file.close()
+        raise
+
+    return {
+        "size": n,
+        "file": file,
+        "mmap": memory_map,
+        "record_size": _record_size(n),
+        "length": (len(memory_map) - HEADER_SIZE)//_record_size(n)
+    }
+
+
+def close_store(store):
+    """
+    Close a store
+
+    Parameters
+    ----------
+    store : dict
+        Store to close
+    """
+    store["mmap"].close()
+    store["file"].close()
+
+
+def store_length(store):
+    """
+    Return the number of positions of a store
+
+    Parameters
+    ----------
+    store : dict
+        Store whose positions are counted
+
+    Returns
+    -------
+    int
+        Number of positions in the file when 'store' was opened
+    """
+    return store["length"]
+
+
+def get_packed(store,k):
+    """
+    Return the packed representation of position k of a store
+
+    Parameters
+    ----------
+    store : dict
+        Store with the position
+    k : int
+        Index of the position, negative indices counting from the end
+
+    Returns
+    -------
+    bytes
+        Packed representation of the goban of position k
+
+    Raises
+    ------
+    IndexError:
+        If there is no position k in 'store'
+    """
+    if not -store["length"] <= k < store["length"]:
+        raise IndexError("get_packed: posicao inexistente")
+
+    start = HEADER_SIZE + (k % store["length"])*store["record_size"]
+
+    return store["mmap"][start:start + store["record_size"]]
+
+
+def get_goban(store,k):
+    """
+    Return the goban of position k of a store
+
+    Parameters
+    ----------
+    store : dict
+        Store with the position
+    k : int
+        Index of the position, negative indices counting from the end
+
+    Returns
+    -------
+    goban
+        Goban of position k
+
+    Raises
+    ------
+    IndexError:
+        If there is no position k in 'store'
+    """
+    return unpack_goban(get_packed(store,k))
@@ -0,0 +1,201 @@
+"""
+Description
+-----------
+This module replays archives of SGF game records with the go module
+
+Every move is checked with classify_move before being performed with
+make_move, so illegal moves (occupied intersections, Suicide and Repetition
+of an earlier goban) are reported and skipped. The final gobans are scored
+with calculate_scores. The files are spread over a process pool in chunks
+
+Usage
+-----
+python3 replay.py DIRECTORY [--output FILE] [--processes N] [--chunksize N]
+
+Functions
+---------
+replay_game(game)
+    Replay a game and return its result
+replay_file(path)
+    Replay the games of an SGF file and return their results
+find_records(directory)
+    Return the paths of the SGF files of a directory and its subdirectories
+main(arguments)
+    Replay the SGF files of a directory and write a table with the results
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import os
+import sys
+
+from go import (
+    calculate_scores, classify_move, create_goban, get_hash,
+    intersection_to_str, make_move
+)
+from sgf import read_games
+
+# Columns of the table of results
+COLUMNS = (
+    "file","game","size","moves","illegal_moves","first_illegal_move",
+    "white_score","black_score","winner","error"
+)
+
+
+def replay_game(game):
+    """
+    Replay a game and return its result
+
+    Parameters
+    ----------
+    game : dict
+        Game read by sgf.read_games
+
+    Returns
+    -------
+    dict
+        Result with the number of moves ("moves"), the illegal moves as
+        triples (move number, intersection, kind) ("illegal_moves"), the
+        scores ("white_score", "black_score"), the winner ("winner", "W" or
+        "B", white winning ties) and a description of why the game could
+        not be replayed ("error"), or None
+    """
+    result = {
+        "size": game["size"], "moves": len(game["moves"]), "illegal_moves": [],
+        "white_score": None, "black_score": None, "winner": None, "error": game["error"]
+    }
+
+    # Games whose moves could not be read entirely are not replayed
+    if game["error"] is not None:
+        return result
+
+    try:
+        goban = create_goban(game["size"],game["white_stones"],game["black_stones"])
+    except ValueError as error:
+        result["error"] = str(error)
+        return result
+
+    history = {get_hash(goban)}
+    for number, (stone, intersection) in enumerate(game["moves"],1):
+        if intersection is None:
+            continue
+
+        kind = classify_move(goban,intersection,stone,history)
+        if kind not in ("placement","capture"):
+            result["illegal_moves"].append((number,intersection_to_str(intersection),kind))
+            continue
+
+        make_move(goban,intersection,stone)
+        history.add(get_hash(goban))
+
+    result["white_score"], result["black_score"] = calculate_scores(goban)
+    result["winner"] = "W" if result["white_score"] >= result["black_score"] else "B"
+
+    return result
+
+
+def replay_file(path):
+    """
+    Replay the games of an SGF file and return their results
+
+    Parameters
+    ----------
+    path : str
+        Path of the SGF file
+
+    Returns
+    -------
+    list
+        Result of each game of the file, as returned by replay_game with
+        the path of the file ("file") and the number of the game in the
+        file ("game")
+    """
+    results = []
+
+    try:
+        for number, game in enumerate(read_games(path),1):
+            result = replay_game(game)
+            result["file"] = path
+            result["game"] = number
+            results.append(result)
+    except OSError as error:
+        results.append({"file": path, "game": None, "error": str(error)})
+
+    return results
+
+
+def find_records(directory):
+    """
+    Return the paths of the SGF files of a directory and its subdirectories
+
+    Parameters
+    ----------
+    directory : str
+        Directory to search
+
+    Returns
+    -------
+    list
+        Sorted paths of the files with the extension .sgf
+    """
+    return sorted(
+        os.path.join(root,name)
+        for root, directories, names in os.walk(directory)
+        for name in names if name.lower().endswith(".sgf")
+    )
+
+
+def _to_row(result):
+    """Return the row of the table of results of a game"""
+    illegal_moves = result.get("illegal_moves",[])
+
+    row = dict(result)
+    row["illegal_moves"] = len(illegal_moves)
+    row["first_illegal_move"] = "{} {} ({})".format(*illegal_moves[0]) if illegal_moves else ""
+
+    return [row.get(x,"") if row.get(x) is not None else "" for x in COLUMNS]
+
+
+def main(arguments = None):
+    """
+    Replay the SGF files of a directory and write a table with the results
+
+    The files are distributed over the processes in chunks, the results are
+    written in the order of the files and the progress is shown on the
+    standard error
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+    """
+    parser = argparse.ArgumentParser(description = "Replay the SGF game records of a directory")
+    parser.add_argument("directory",help = "directory with the SGF files")
+    parser.add_argument("--output",default = "-",help = "CSV file with the results, standard output by default")
+    parser.add_argument("--processes",type = int,default = None,help = "number of processes")
+    parser.add_argument("--chunksize",type = int,default = 16,help = "files sent to a process at a time")
+    arguments = parser.parse_args(arguments)
+
+    paths = find_records(arguments.directory)
+    output = sys.stdout if arguments.output == "-" else open(arguments.output,"w",newline = "")
+
+    try:
+        writer = csv.writer(output)
+        writer.writerow(COLUMNS)
+
+        with concurrent.futures.ProcessPoolExecutor(arguments.processes) as executor:
+            results = executor.map(replay_file,paths,chunksize = max(1,arguments.chunksize))
+
+            for done, file_results in enumerate(results,1):
+                writer.writerows(_to_row(x) for x in file_results)
+                print("\r{}/{} files".format(done,len(paths)),end = "",file = sys.stderr)
+
+        print(file = sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Description
+-----------
+This module hosts many simultaneous games of the go module on a local asyncio
+server, over TCP or a Unix socket
+
+Each connection sends one request per line and receives one response per
+line, "=" followed by the result or "?" followed by an error message. A
+connection may play several games at once, identified by the numbers
+returned by "new":
+-> new N: create a game on an n x n goban and return its number
+-> play GAME COLOR MOVE: perform a move, where COLOR is "B" or "W" and MOVE
+   is an intersection such as "D4" or "P" to pass
+-> genmove GAME COLOR: perform and return a move chosen by the server
+-> score GAME: return the scores of the white and black player
+-> close GAME: forget a game
+As in go(), a move that repeats an earlier goban of the game is illegal
+
+Moves are checked and performed in the event loop with is_legal_move and
+make_move, which take microseconds. Choosing moves and scoring run in a
+process pool, receiving the goban packed by pack_goban, so the event loop
+never waits for them
+
+Usage
+-----
+python3 server.py [--host HOST] [--port PORT] [--unix PATH] [--processes N] [--playouts N]
+
+Functions
+---------
+handle_connection(reader,writer,state)
+    Serve the requests of a connection until it closes
+serve(host,port,unix,processes,playouts)
+    Run the server until it is cancelled
+main(arguments)
+    Run the server with the options given in the command line
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+
+from go import (
+    calculate_scores, create_black_stone, create_empty_goban,
+    create_random_player, create_white_stone, get_hash, intersection_to_str,
+    is_legal_move, is_valid_intersection, make_move, pack_goban,
+    str_to_intersection, unpack_goban
+)
+from mcts import choose_move
+
+
+def _generate_move(packed,stone,history,playouts,seed):
+    """
+    Return the move chosen for a player, run in the process pool
+
+    Parameters
+    ----------
+    packed : bytes
+        Goban packed by pack_goban
+    stone : stone
+        Player's stone
+    history : set
+        Hashes of every goban that occurred earlier in the game
+    playouts : int
+        Playouts of the search, or 0 to choose a random legal move that does
+        not fill one of the player's eyes
+    seed : int
+        Seed of the random moves
+
+    Returns
+    -------
+    str
+        External representation of the intersection of the move, or "P" to pass
+    """
+    goban = unpack_goban(packed)
+
+    if playouts == 0:
+        intersection = create_random_player(seed)(goban,stone,history)
+    else:
+        intersection = choose_move(goban,stone,history,playouts,None,1,seed)
+
+    return "P" if intersection is None else intersection_to_str(intersection)
+
+
+def _score(packed):
+    """Return the scores of a packed goban, run in the process pool"""
+    return calculate_scores(unpack_goban(packed))
+
+
+def _to_stone(color):
+    """Return the stone of a color "B" or "W", raising ValueError otherwise"""
+    if color.upper() == "B":
+        return create_black_stone()
+    if color.upper() == "W":
+        return create_white_stone()
+
+    raise ValueError("invalid color")
+
+
+def _get_game(state,games,identifier):
+    """Return a game of a connection, raising ValueError if there is none"""
+    if identifier not in games:
+        raise ValueError("unknown game")
+
+    return state["games"][identifier]
+
+
+def _play(game,stone,move):
+    """
+    Perform a move on a game, or a pass if 'move' is "P"
+
+    Raises
+    ------
+    ValueError:
+        If the move is illegal
+    """
+    if move.upper() == "P":
+        return
+
+    goban = game["goban"]
+    if (
+        not 2 <= len(move) <= 3 or
+        not "A" <= move[0].upper() <= "S" or
+        not move[1:].isdigit() or
+        not 1 <= int(move[1:]) <= 19 or
+        not is_valid_intersection(goban,str_to_intersection(move.upper()))
+    ):
+        raise ValueError("invalid move")
+
+    intersection = str_to_intersection(move.upper())
+    if not is_legal_move(goban,intersection,stone,None,game["history"]):
+        raise ValueError("illegal move")
+
+    make_move(goban,intersection,stone)
+    game["history"].add(get_hash(goban))
+
+
+async def _handle_request(state,games,words):
+    """
+    Run a request of a connection and return its result
+
+    Parameters
+    ----------
+    state : dict
+        State of the server
+    games : set
+        Numbers of the games of the connection
+    words : list
+        Words of the request
+
+    Returns
+    -------
+    str
+        Result of the request
+
+    Raises
+    ------
+    ValueError:
+        If the request is not valid or cannot be performed
+    """
+    loop = asyncio.get_running_loop()
+    command, arguments = words[0].lower(), words[1:]
+
+    if command == "new" and len(arguments) == 1 and arguments[0] in ("9","13","19"):
+        identifier = str(next(state["numbers"]))
+        goban = create_empty_goban(int(arguments[0]))
+        state["games"][identifier] = {"goban": goban, "history": {get_hash(goban)}}
+        games.add(identifier)
+        return identifier
+
+    if command == "play" and len(arguments) == 3:
+        _play(_get_game(state,games,arguments[0]),_to_stone(arguments[1]),arguments[2])
+        return ""
+
+    if command == "genmove" and len(arguments) == 2:
+        game = _get_game(state,games,arguments[0])
+        stone = _to_stone(arguments[1])
+        move = await loop.run_in_executor(state["executor"],_generate_move,pack_goban(game["goban"]),
+                                          stone,game["history"],state["playouts"],next(state["seeds"]))
+        _play(game,stone,move)
+        return move
+
+    if command == "score" and len(arguments) == 1:
+        game = _get_game(state,games,arguments[0])
+        white_score, black_score = await loop.run_in_executor(state["executor"],_score,
+                                                              pack_goban(game["goban"]))
+        return "{} {}".format(white_score,black_score)
+
+    if command == "close" and len(arguments) == 1:
+        _get_game(state,games,arguments[0])
+        games.discard(arguments[0])
+        del state["games"][arguments[0]]
+        return ""
+
+    raise ValueError("invalid request")
+
+
+async def handle_connection(reader,writer,state):
+    """
+    Serve the requests of a connection until it closes
+
+    The games created by the connection are forgotten when it closes
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        Stream with the requests
+    writer : asyncio.StreamWriter
+        Stream where the responses are written
+    state : dict
+        State of the server, with the games ("games"), the generators of
+        game numbers ("numbers") and seeds ("seeds"), the process pool
+        ("executor") and the playouts of each generated move ("playouts")
+    """
+    games = set()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+
+            words = line.decode("ascii","replace").split()
+            if not words:
+                continue
+
+            try:
+                response = "= " + await _handle_request(state,games,words)
+            except ValueError as error:
+                response = "? " + str(error)
+
+            writer.write(response.rstrip().encode("ascii") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        for identifier in games:
+            state["games"].pop(identifier,None)
+        writer.close()
+
+
+async def serve(host = "127.0.0.1",port = 9999,unix = None,processes = None,playouts = 0):
+    """
+    Run the server until it is cancelled
+
+    Parameters
+    ----------
+    host : str, optional
+        Address where the server listens over TCP
+    port : int, optional
+        Port where the server listens over TCP
+    unix : str, optional
+        Path of a Unix socket where the server listens instead of TCP
+    processes : int, optional
+        Number of processes of the pool, by default the number of processors
+    playouts : int, optional
+        Playouts of the search of each generated move, or 0 to generate
+        random legal moves that do not fill the player's eyes
+    """
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        state = {
+            "games": {},
+            "numbers": itertools.count(1),
+            "seeds": itertools.count(),
+            "executor": executor,
+            "playouts": playouts
+        }
+
+        def connected(reader,writer):
+            """Serve a new connection"""
+            return handle_connection(reader,writer,state)
+
+        if unix is not None:
+            server = await asyncio.start_unix_server(connected,unix)
+        else:
+            server = await asyncio.start_server(connected,host,port)
+
+        async with server:
+            await server.serve_forever()
+
+
+def main(arguments = None):
+    """
+    Run the server with the options given in the command line
+
+    Parameters
+    ----------
+    arguments : list, optional
+        Command-line arguments, taken from sys.argv if not given
+    """
+    parser = argparse.ArgumentParser(description = "Host games of the go module on a local server")
+    parser.add_argument("--host",default = "127.0.0.1",help = "address of the server")
+    parser.add_argument("--port",type = int,default = 9999,help = "TCP port of the server")
+    parser.add_argument("--unix",help = "path of a Unix socket to listen on instead of TCP")
+    parser.add_argument("--processes",type = int,default = None,help = "processes choosing moves and scoring")
+    parser.add_argument("--playouts",type = int,default = 0,help = "playouts of each generated move, 0 for random moves")
+    arguments = parser.parse_args(arguments)
+
+    try:
+        asyncio.run(serve(arguments.host,arguments.port,arguments.unix,arguments.processes,arguments.playouts))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
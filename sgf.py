@@ -0,0 +1,420 @@
+"""
+Description
+-----------
+This module reads and writes game records of the go module in the Smart Game
+Format (SGF)
+
+A game is represented by a dictionary with:
+-> "size": dimension n of the goban
+-> "white_stones": intersections occupied by white stones before the first
+   move (the AW property), to be given to create_goban
+-> "black_stones": intersections occupied by black stones before the first
+   move (the AB property), to be given to create_goban
+-> "moves": list of pairs (stone, intersection) with the moves of the main
+   line of the game, where the intersection is None for a pass
+-> "properties": dictionary with the list of values of each of the other
+   properties of the first node, such as the players' names (PW, PB) or the
+   result (RE)
+-> "error": None, or a description of why the moves of the game could not
+   be read entirely
+
+Files are read in chunks and games are returned one at a time, so collections
+of any size are read in constant memory
+
+Functions
+---------
+create_game(n,white_stones,black_stones,moves,properties)
+    Return a game
+read_games(file)
+    Return an iterator over the games of an SGF collection
+game_to_sgf(game)
+    Return the SGF representation of a game
+write_game(file,game)
+    Write the SGF representation of a game to a file
+"""
+
+from go import (
+    create_black_stone, create_intersection, create_white_stone, get_col,
+    get_row, is_black_stone, is_white_stone
+)
+
+# Number of characters read from a file at a time
+CHUNK_SIZE = 1 << 16
+
+# Properties written from the other fields of a game
+_GAME_PROPERTIES = ("FF","GM","SZ","AB","AW","AE","B","W")
+
+
+def create_game(n,white_stones = (),black_stones = (),moves = (),properties = None):
+    """
+    Return a game
+
+    Parameters
+    ----------
+    n : int
+        Dimension of the goban
+    white_stones : tuple, optional
+        Intersections occupied by white stones before the first move
+    black_stones : tuple, optional
+        Intersections occupied by black stones before the first move
+    moves : iterable, optional
+        Pairs (stone, intersection) with the moves, None meaning a pass
+    properties : dict, optional
+        Values of the other properties of the game, each an iterable of
+        strings or a single string, which is taken as its only value
+
+    Returns
+    -------
+    dict
+        Game with the given stones, moves and properties
+    """
+    properties = {
+        identifier: [values] if isinstance(values,str) else list(values)
+        for identifier, values in (properties or {}).items()
+    }
+
+    return {
+        "size": n,
+        "white_stones": tuple(white_stones),
+        "black_stones": tuple(black_stones),
+        "moves": list(moves),
+        "properties": properties,
+        "error": None
+    }
+
+
+def _read_tokens(file):
+    """
+    Return an iterator over the tokens of an SGF collection
+
+    Parameters
+    ----------
+    file : file
+        Text file with the collection
+
+    Returns
+    -------
+    iterator
+        Tokens "(", ")" and ";", and pairs (identifier, values) with the
+        identifier and the list of values of each property
+    """
+    identifier = ""
+    values = []
+    value = []
+    in_value = False
+    escaped = False
+
+    for chunk in iter(lambda: file.read(CHUNK_SIZE),""):
+        for character in chunk:
+            if in_value:
+                # A backslash escapes the next character, and is removed
+                # together with a following line break
+                if escaped:
+                    escaped = False
+                    if character != "\n" and character != "\r":
+                        value.append(character)
+                elif character == "\\":
+                    escaped = True
+                elif character == "]":
+                    in_value = False
+                    values.append("".join(value))
+                    value = []
+                else:
+                    value.append(character)
+
+            elif character == "[":
+                in_value = True
+
+            elif "A" <= character <= "Z":
+                # A letter after the values of a property starts a new one
+                if values:
+                    yield (identifier,values)
+                    identifier, values = "", []
+                identifier += character
+
+            elif character in "();":
+                if values:
+                    yield (identifier,values)
+                identifier, values = "", []
+                yield character
+
+    if values:
+        yield (identifier,values)
+
+
+def _sgf_to_intersection(value,n):
+    """
+    Return the intersection represented by an SGF point
+
+    Parameters
+    ----------
+    value : str
+        SGF point, with the column and the row from the top as letters
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    intersection or None
+        Represented intersection, or None for a pass
+
+    Raises
+    ------
+    ValueError:
+        If 'value' does not represent an intersection of an n x n goban
+    """
+    if value == "" or (value == "tt" and n <= 19):
+        return None
+
+    if len(value) != 2 or not "a" <= value[0] <= "z" or not "a" <= value[1] <= "z":
+        raise ValueError("ponto invalido: " + value)
+
+    row = n - (ord(value[1]) - ord("a"))
+    if not 1 <= row <= n or ord(value[0]) - ord("a") >= n:
+        raise ValueError("ponto invalido: " + value)
+
+    return create_intersection(chr(ord("A") + ord(value[0]) - ord("a")),row)
+
+
+def _sgf_to_intersections(values,n):
+    """
+    Return the intersections represented by a list of SGF points
+
+    Parameters
+    ----------
+    values : list
+        SGF points, or rectangles of points given by two opposite corners
+        separated by ':'
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    tuple
+        Represented intersections
+    """
+    intersections = ()
+
+    for value in values:
+        if ":" not in value:
+            intersections += (_sgf_to_intersection(value,n),)
+            continue
+
+        # Expand the rectangle between two opposite corners
+        first, last = (_sgf_to_intersection(x,n) for x in value.split(":",1))
+        for column in range(ord(min(get_col(first),get_col(last))),ord(max(get_col(first),get_col(last))) + 1):
+            for row in range(min(get_row(first),get_row(last)),max(get_row(first),get_row(last)) + 1):
+                intersections += (create_intersection(chr(column),row),)
+
+    return intersections
+
+
+def _read_node(game,node,first):
+    """
+    Add the properties of a node of the main line to a game
+
+    The order of the properties of a node is not significant, so the size is
+    read before any point of the node is decoded. Setup properties (AB, AW,
+    AE) are only accepted in the first node, as a game has no way to change
+    the goban between moves, and are an error in later nodes
+
+    Parameters
+    ----------
+    game : dict
+        Game being read
+    node : list
+        Pairs (identifier, values) with the properties of the node
+    first : bool
+        Whether the node is the first node of the game
+    """
+    for identifier, values in sorted(node,key = lambda x: x[0] != "SZ"):
+        if game["error"] is not None:
+            return
+
+        try:
+            if identifier in ("B","W"):
+                stone = create_black_stone() if identifier == "B" else create_white_stone()
+                game["moves"].append((stone,_sgf_to_intersection(values[0],game["size"])))
+            elif identifier in ("AB","AW","AE") and not first:
+                raise ValueError("posicao alterada depois do primeiro no")
+            elif not first:
+                continue
+            elif identifier == "SZ":
+                game["size"] = int(values[0].split(":")[0])
+            elif identifier == "AB":
+                game["black_stones"] += _sgf_to_intersections(values,game["size"])
+            elif identifier == "AW":
+                game["white_stones"] += _sgf_to_intersections(values,game["size"])
+            elif identifier == "AE":
+                cleared = _sgf_to_intersections(values,game["size"])
+                game["black_stones"] = tuple(x for x in game["black_stones"] if x not in cleared)
+                game["white_stones"] = tuple(x for x in game["white_stones"] if x not in cleared)
+            elif identifier not in _GAME_PROPERTIES:
+                game["properties"][identifier] = values
+        except ValueError as error:
+            game["error"] = "{}[{}]: {}".format(identifier,"][".join(values),error)
+
+
+def _read_collection(file):
+    """
+    Return an iterator over the games of an SGF collection in a text file
+
+    Only the main line of each game is read, i.e. the first variation of
+    every node with variations. The properties of each node are kept until
+    the node ends and are then added to the game by _read_node
+
+    Parameters
+    ----------
+    file : file
+        Text file with the collection
+
+    Returns
+    -------
+    iterator
+        Games of the collection
+    """
+    game = None
+    on_main_line = []    # Whether each open game tree is on the main line
+    children = []    # Number of game trees already opened inside each one
+    node = None    # Properties of the open node of the main line
+    nodes = 0
+
+    for token in _read_tokens(file):
+        # Any of these tokens ends the open node
+        if token in ("(",")",";") and node is not None:
+            _read_node(game,node,nodes == 1)
+            node = None
+
+        if token == "(":
+            if not on_main_line:
+                game = create_game(19)
+                nodes = 0
+                on_main_line, children = [True], [0]
+            else:
+                on_main_line.append(on_main_line[-1] and children[-1] == 0)
+                children[-1] += 1
+                children.append(0)
+
+        elif token == ")":
+            if on_main_line:
+                on_main_line.pop()
+                children.pop()
+                if not on_main_line:
+                    yield game
+
+        elif token == ";":
+            if on_main_line and on_main_line[-1]:
+                nodes += 1
+                node = []
+
+        elif node is not None:
+            node.append(token)
+
+
+def read_games(file):
+    """
+    Return an iterator over the games of an SGF collection
+
+    The file is read in chunks of CHUNK_SIZE characters while the games are
+    requested, so only the game being read is kept in memory
+
+    Parameters
+    ----------
+    file : str or file
+        Path of the file with the collection, or a text file
+
+    Returns
+    -------
+    iterator
+        Games of the collection in the order they appear
+    """
+    if isinstance(file,str):
+        with open(file,encoding = "utf-8",errors = "replace") as opened_file:
+            yield from _read_collection(opened_file)
+    else:
+        yield from _read_collection(file)
+
+
+def _intersection_to_sgf(intersection,n):
+    """
+    Return the SGF point of an intersection
+
+    Parameters
+    ----------
+    intersection : intersection or None
+        Intersection to represent, or None for a pass
+    n : int
+        Dimension of the goban
+
+    Returns
+    -------
+    str
+        SGF point of 'intersection', or "" for a pass
+    """
+    if intersection is None:
+        return ""
+
+    return get_col(intersection).lower() + chr(ord("a") + n - get_row(intersection))
+
+
+def _escape(value):
+    """Return an SGF property value with its special characters escaped"""
+    return value.replace("\\","\\\\").replace("]","\\]")
+
+
+def game_to_sgf(game):
+    """
+    Return the SGF representation of a game
+
+    Parameters
+    ----------
+    game : dict
+        Game to represent
+
+    Returns
+    -------
+    str
+        SGF game tree with a first node with the goban and the stones placed
+        before the first move, followed by one node per move
+
+    Raises
+    ------
+    ValueError:
+        If a move of 'game' is not made with a player's stone
+    """
+    n = game["size"]
+    root = "FF[4]GM[1]SZ[{}]".format(n)
+
+    for identifier, values in game["properties"].items():
+        if isinstance(values,str):
+            values = [values]
+        root += identifier + "".join("[" + _escape(x) + "]" for x in values)
+
+    for identifier, intersections in (("AB",game["black_stones"]),("AW",game["white_stones"])):
+        if intersections:
+            root += identifier + "".join("[" + _intersection_to_sgf(x,n) + "]" for x in intersections)
+
+    moves = ""
+    for stone, intersection in game["moves"]:
+        identifier = "B" if is_black_stone(stone) else "W" if is_white_stone(stone) else None
+        if identifier is None:
+            raise ValueError("game_to_sgf: argumento invalido")
+        moves += ";{}[{}]".format(identifier,_intersection_to_sgf(intersection,n))
+
+    return "(;" + root + moves + ")\n"
+
+
+def write_game(file,game):
+    """
+    Write the SGF representation of a game to a file
+
+    Writing several games to the same file builds an SGF collection
+
+    Parameters
+    ----------
+    file : file
+        Text file where the game is written
+    game : dict
+        Game to write
+    """
+    file.write(game_to_sgf(game))
@@ -0,0 +1,386 @@
+"""
+Description
+-----------
+This module keeps a bounded transposition table of results derived from the
+gobans of the go module, such as scores, territories, legal moves or the
+values of a search
+
+Results are indexed by the Zobrist hash of the goban, the player to move and
+the kind of result, so the same position reached by different sequences of
+moves shares its entries. The table estimates the memory of its entries and
+evicts entries when it would exceed its cap, either the least recently used
+ones ("lru") or, among the least recently used ones, the shallowest
+("depth"), where the depth is given with each result
+
+A table is represented by a dictionary with:
+-> "entries": ordered dictionary with a triple (result, depth, bytes) for
+   each key, from the least to the most recently used
+-> "policy": replacement policy, "lru" or "depth"
+-> "max_bytes": memory cap of the entries, in bytes
+-> "bytes": estimated memory of the entries, in bytes
+-> "hits", "misses", "evictions", "rejections": number of lookups that found
+   or did not find their key, of evicted entries and of results not stored
+   because the entries they would evict were deeper
+
+Functions
+---------
+create_table(max_bytes,policy)
+    Return an empty transposition table
+position_key(goban,stone,kind)
+    Return the key of a result of a position
+table_lookup(table,key)
+    Return the result stored for a key, or None if there is none
+table_store(table,key,result,depth)
+    Store a result and return whether it was stored
+clear_table(table)
+    Remove every entry of a table
+get_table_stats(table)
+    Return the statistics of a table
+cached_scores(table,goban)
+    Return each player's score, reusing the result stored in a table
+cached_territories(table,goban)
+    Return the territories of a goban, reusing the result stored in a table
+cached_legal_moves(table,goban,stone)
+    Return the legal moves of a player, reusing the result stored in a table
+"""
+
+import collections
+import itertools
+import sys
+
+from go import (
+    calculate_scores, create_neutral_stone, get_hash, get_legal_moves,
+    get_territories, is_black_stone, is_white_stone
+)
+
+# Estimated memory of an entry besides its result: the key and the node of
+# the ordered dictionary
+ENTRY_BYTES = 200
+
+# Number of least recently used entries among which the "depth" policy
+# chooses the shallowest to evict
+DEPTH_CANDIDATES = 8
+
+
+def create_table(max_bytes = 64 << 20,policy = "lru"):
+    """
+    Return an empty transposition table
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Memory cap of the entries, in bytes
+    policy : str, optional
+        Replacement policy, "lru" or "depth"
+
+    Returns
+    -------
+    dict
+        Table without entries
+
+    Raises
+    ------
+    ValueError:
+        If 'max_bytes' is not a positive integer or 'policy' is not "lru" or
+        "depth"
+    """
+    if not isinstance(max_bytes,int) or max_bytes <= 0 or policy not in ("lru","depth"):
+        raise ValueError("create_table: argumentos invalidos")
+
+    return {
+        "entries": collections.OrderedDict(),
+        "policy": policy,
+        "max_bytes": max_bytes,
+        "bytes": 0,
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "rejections": 0
+    }
+
+
+def position_key(goban,stone,kind):
+    """
+    Return the key of a result of a position
+
+    Parameters
+    ----------
+    goban : goban
+        Goban of the position
+    stone : stone
+        Stone of the player to move, or a neutral stone for results that do
+        not depend on it
+    kind : str
+        Kind of the result, e.g. "scores" or "search"
+
+    Returns
+    -------
+    tuple
+        Key with the hash of the goban, the dimension of the goban, the
+        player to move (0 for none, 1 for black, 2 for white) and the kind
+    """
+    player = 1 if is_black_stone(stone) else 2 if is_white_stone(stone) else 0
+
+    return (get_hash(goban),goban["size"],player,kind)
+
+
+def _size_of(result):
+    """
+    Return an estimate of the memory of a result
+
+    Parameters
+    ----------
+    result : universal
+        Result to measure, whose tuples, lists, sets and dictionaries are
+        measured with their elements, so intersections shared with the go
+        module are counted too and the estimate errs on the safe side
+
+    Returns
+    -------
+    int
+        Estimated memory of 'result', in bytes
+    """
+    seen = set()
+    pending = [result]
+    size = 0
+
+    while pending:
+        value = pending.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+
+        size += sys.getsizeof(value)
+        if isinstance(value,dict):
+            pending.extend(value.keys())
+            pending.extend(value.values())
+        elif isinstance(value,(tuple,list,set,frozenset)):
+            pending.extend(value)
+
+    return size
+
+
+def table_lookup(table,key):
+    """
+    Return the result stored for a key, or None if there is none
+
+    Parameters
+    ----------
+    table : dict
+        Table where the key is searched for
+    key : tuple
+        Key returned by position_key
+
+    Returns
+    -------
+    universal
+        Stored result, which becomes the most recently used, or None
+    """
+    entry = table["entries"].get(key)
+
+    if entry is None:
+        table["misses"] += 1
+        return None
+
+    table["hits"] += 1
+    table["entries"].move_to_end(key)
+
+    return entry[0]
+
+
+def table_store(table,key,result,depth = 0):
+    """
+    Store a result and return whether it was stored
+
+    Parameters
+    ----------
+    table : dict
+        Table where the result is stored
+    key : tuple
+        Key returned by position_key
+    result : universal
+        Result to store, which should not be modified afterwards
+    depth : int, optional
+        Depth of the search that obtained the result, used by the "depth"
+        policy to keep the results that cost more to obtain
+
+    Returns
+    -------
+    bool
+        True if the result was stored, False if it does not fit in the table
+        or, with the "depth" policy, would evict deeper results
+    """
+    entries = table["entries"]
+    size = ENTRY_BYTES + _size_of(result)
+
+    if size > table["max_bytes"]:
+        table["rejections"] += 1
+        return False
+
+    previous = entries.pop(key,None)
+    if previous is not None:
+        table["bytes"] -= previous[2]
+
+    # Choose every victim before evicting any, so that a rejected result
+    # leaves the table as it was
+    victims = []
+    freed = 0
+    order = iter(entries)
+    candidates = []
+    while table["bytes"] - freed + size > table["max_bytes"]:
+        # Evict the least recently used entry or, with the "depth" policy,
+        # the shallowest of the least recently used ones, unless all of them
+        # are deeper than the new result
+        if table["policy"] == "depth":
+            candidates.extend(itertools.islice(order,DEPTH_CANDIDATES - len(candidates)))
+            victim = min(candidates,key = lambda x: entries[x][1])
+            if entries[victim][1] > depth:
+                if previous is not None:
+                    entries[key] = previous
+                    table["bytes"] += previous[2]
+                table["rejections"] += 1
+                return False
+            candidates.remove(victim)
+        else:
+            victim = next(order)
+
+        victims.append(victim)
+        freed += entries[victim][2]
+
+    for victim in victims:
+        table["bytes"] -= entries.pop(victim)[2]
+        table["evictions"] += 1
+
+    entries[key] = (result,depth,size)
+    table["bytes"] += size
+
+    return True
+
+
+def clear_table(table):
+    """
+    Remove every entry of a table
+
+    The statistics of the table are kept
+
+    Parameters
+    ----------
+    table : dict
+        Table to clear
+    """
+    table["entries"].clear()
+    table["bytes"] = 0
+
+
+def get_table_stats(table):
+    """
+    Return the statistics of a table
+
+    Parameters
+    ----------
+    table : dict
+        Table whose statistics are obtained
+
+    Returns
+    -------
+    dict
+        Number of entries ("entries"), estimated memory ("bytes"), hits,
+        misses, fraction of lookups that hit ("hit_rate"), evictions and
+        rejections of the table
+    """
+    lookups = table["hits"] + table["misses"]
+
+    return {
+        "entries": len(table["entries"]),
+        "bytes": table["bytes"],
+        "hits": table["hits"],
+        "misses": table["misses"],
+        "hit_rate": table["hits"]/lookups if lookups else 0.0,
+        "evictions": table["evictions"],
+        "rejections": table["rejections"]
+    }
+
+
+def cached_scores(table,goban):
+    """
+    Return each player's score, reusing the result stored in a table
+
+    Parameters
+    ----------
+    table : dict
+        Table with the stored results
+    goban : goban
+        Goban from which the scores will be retrieved
+
+    Returns
+    -------
+    tuple
+        Scores of the white and black player, as returned by calculate_scores
+    """
+    key = position_key(goban,create_neutral_stone(),"scores")
+    scores = table_lookup(table,key)
+
+    if scores is None:
+        scores = calculate_scores(goban)
+        table_store(table,key,scores)
+
+    return scores
+
+
+def cached_territories(table,goban):
+    """
+    Return the territories of a goban, reusing the result stored in a table
+
+    Parameters
+    ----------
+    table : dict
+        Table with the stored results
+    goban : goban
+        Goban whose territories will be retrieved
+
+    Returns
+    -------
+    tuple
+        Territories of 'goban', as returned by get_territories
+    """
+    key = position_key(goban,create_neutral_stone(),"territories")
+    territories = table_lookup(table,key)
+
+    if territories is None:
+        territories = get_territories(goban)
+        table_store(table,key,territories)
+
+    return territories
+
+
+def cached_legal_moves(table,goban,stone):
+    """
+    Return the legal moves of a player, reusing the result stored in a table
+
+    The moves depend only on the position, so Repetition (Ko) of earlier
+    gobans is not checked: the chosen move can be checked with is_legal_move
+    and the history of the game
+
+    Parameters
+    ----------
+    table : dict
+        Table with the stored results
+    goban : goban
+        Goban where the moves would be performed
+    stone : stone
+        Player's stone to be placed
+
+    Returns
+    -------
+    int
+        Bitmask of the moves that are not a Suicide, as returned by
+        get_legal_moves with 'bitmask' True and no history
+    """
+    key = position_key(goban,stone,"legal_moves")
+    moves = table_lookup(table,key)
+
+    if moves is None:
+        moves = get_legal_moves(goban,stone,None,True)
+        table_store(table,key,moves)
+
+    return moves